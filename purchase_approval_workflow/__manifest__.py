@@ -1,6 +1,6 @@
 {
     'name': 'Three-Level Purchase Approval Workflow',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'summary': 'Advanced three-level approval workflow for purchase orders',
     'description': """
 Three-Level Purchase Approval Workflow
@@ -11,6 +11,9 @@ This module provides a comprehensive approval workflow for purchase orders with:
 - Group-based access control for different approval levels
 - Email notifications at each approval stage
 - Enhanced purchase order states and workflow
+- Scheduled reminders and escalation of stalled approvals
+- Approval latency statistics per level
+- Append-only approval event log for throughput analysis
 
 Approval Levels:
 - ≤ 5,000: Auto-approved
@@ -27,8 +30,10 @@ States: draft → to_approve → approved_level1 → approved_level2 → purchas
         'security/purchase_approval_groups.xml',
         'security/ir.model.access.csv',
         'data/mail_templates.xml',
+        'data/ir_cron_data.xml',
         'views/purchase_approval_config_views.xml',
         'views/purchase_order_views.xml',
+        'views/purchase_approval_event_views.xml',
         'views/menu.xml',
     ],
     'demo': [],
@@ -0,0 +1,9 @@
+def migrate(cr, version):
+    # Orders already waiting for approval before the request date existed are dated by their last
+    # update, so the escalation cron and the latency statistics take them into account
+    cr.execute("""
+        UPDATE purchase_order
+           SET approval_request_date = COALESCE(write_date, create_date)
+         WHERE approval_request_date IS NULL
+           AND state IN ('to_approve', 'approved_level1')
+    """)
\ No newline at end of file
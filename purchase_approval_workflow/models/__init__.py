@@ -1 +1,3 @@
-from . import purchase_order
\ No newline at end of file
+from . import purchase_order
+from . import purchase_approval_event
+from . import res_users
\ No newline at end of file
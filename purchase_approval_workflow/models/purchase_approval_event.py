@@ -0,0 +1,66 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+
+
+class PurchaseApprovalEvent(models.Model):
+    _name = 'purchase.approval.event'
+    _description = 'Purchase Approval Event'
+    _order = 'date desc, id desc'
+    _rec_name = 'order_id'
+
+    order_id = fields.Many2one(
+        'purchase.order',
+        string='Purchase Order',
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete='cascade'
+    )
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True)
+    
+    level = fields.Selection([
+        ('auto', 'Auto Approval'),
+        ('level1', 'Level 1'),
+        ('level2', 'Level 2'),
+    ], string='Approval Level', required=True, readonly=True)
+    
+    action = fields.Selection([
+        ('request', 'Approval Requested'),
+        ('approve', 'Approved'),
+        ('reject', 'Rejected'),
+        ('escalate', 'Escalated'),
+    ], string='Action', required=True, readonly=True)
+    
+    user_id = fields.Many2one(
+        'res.users',
+        string='User',
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user
+    )
+    date = fields.Datetime(string='Date', required=True, readonly=True, default=fields.Datetime.now)
+    
+    duration_hours = fields.Float(
+        string='Waiting Time (Hours)',
+        readonly=True,
+        aggregator='avg',
+        help="Hours the order waited at this level before the action"
+    )
+
+    def init(self):
+        tools.create_index(
+            self._cr, 'purchase_approval_event_user_id_date_index', self._table, ['user_id', 'date']
+        )
+
+    def write(self, vals):
+        raise UserError(_("Approval events cannot be modified"))
+
+    def unlink(self):
+        raise UserError(_("Approval events cannot be deleted"))
+
+    @api.model
+    def _log_events(self, vals_list):
+        """Append approval events in a single batch insert"""
+        if not vals_list:
+            return self.browse()
+        return self.sudo().create(vals_list)
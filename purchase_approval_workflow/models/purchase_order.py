@@ -1,5 +1,18 @@
-from odoo import models, fields, api, _
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, AccessError
+from odoo.osv import expression
+
+_logger = logging.getLogger(__name__)
+
+# Escalation cron limits: orders handled per batch and wall time per run (seconds)
+ESCALATION_BATCH_SIZE = 100
+ESCALATION_TIME_LIMIT = 120
 
 
 class PurchaseApprovalConfig(models.Model):
@@ -32,6 +45,28 @@ class PurchaseApprovalConfig(models.Model):
     
     active = fields.Boolean(string='Active', default=True)
 
+    escalation_delay_hours = fields.Integer(
+        string='Reminder Delay (Hours)',
+        default=48,
+        required=True,
+        help="Orders waiting for approval longer than this send a reminder to the pending approvers"
+    )
+
+    escalation_max_reminders = fields.Integer(
+        string='Reminders Before Escalation',
+        default=2,
+        required=True,
+        help="Number of reminders sent for an order in 'To Approve' before it is escalated to Level 2 approvers"
+    )
+
+    @api.constrains('escalation_delay_hours', 'escalation_max_reminders')
+    def _check_escalation_settings(self):
+        for config in self:
+            if config.escalation_delay_hours <= 0:
+                raise UserError(_("Reminder delay must be a positive number of hours"))
+            if config.escalation_max_reminders < 0:
+                raise UserError(_("Reminders before escalation cannot be negative"))
+
     @api.constrains('auto_approve_limit', 'level1_approve_limit')
     def _check_approval_limits(self):
         for config in self:
@@ -60,6 +95,18 @@ class PurchaseApprovalConfig(models.Model):
         
         return config
 
+    @api.model
+    def get_current_configs(self, company_ids):
+        """Get the current active approval configuration of several companies at once"""
+        configs = {}
+        for config in self.search([('company_id', 'in', list(company_ids)), ('active', '=', True)]):
+            configs.setdefault(config.company_id.id, config)
+        
+        for company_id in set(company_ids) - set(configs):
+            configs[company_id] = self.get_current_config(company_id)
+        
+        return configs
+
 
 class PurchaseOrder(models.Model):
     _inherit = 'purchase.order'
@@ -84,14 +131,48 @@ class PurchaseOrder(models.Model):
     ], string='Approval Level Required', compute='_compute_approval_level', store=True)
     
     level1_approver_id = fields.Many2one('res.users', string='Level 1 Approver', readonly=True)
-    level1_approval_date = fields.Datetime(string='Level 1 Approval Date', readonly=True)
+    level1_approval_date = fields.Datetime(string='Level 1 Approval Date', readonly=True, index=True)
     level2_approver_id = fields.Many2one('res.users', string='Level 2 Approver', readonly=True)  
     level2_approval_date = fields.Datetime(string='Level 2 Approval Date', readonly=True)
 
+    # Escalation tracking fields
+    approval_request_date = fields.Datetime(
+        string='Approval Requested On',
+        readonly=True,
+        index=True,
+        copy=False,
+        help="Date the order entered the 'To Approve' state"
+    )
+    approval_reminder_count = fields.Integer(string='Approval Reminders Sent', readonly=True, copy=False)
+    approval_last_reminder_date = fields.Datetime(string='Last Approval Reminder', readonly=True, copy=False)
+    approval_escalated = fields.Boolean(string='Escalated to Level 2', readonly=True, copy=False)
+
+    # Approval latency statistics (hours spent waiting at each level)
+    level1_approval_hours = fields.Float(
+        string='Level 1 Approval Time (Hours)',
+        readonly=True,
+        copy=False,
+        aggregator='avg'
+    )
+    level2_approval_hours = fields.Float(
+        string='Level 2 Approval Time (Hours)',
+        readonly=True,
+        copy=False,
+        aggregator='avg'
+    )
+
+    approval_event_ids = fields.One2many(
+        'purchase.approval.event',
+        'order_id',
+        string='Approval Events',
+        readonly=True
+    )
+
     @api.depends('amount_total', 'company_id')
     def _compute_approval_level(self):
+        configs = self.env['purchase.approval.config'].get_current_configs((self.company_id | self.env.company).ids)
         for order in self:
-            config = self.env['purchase.approval.config'].get_current_config(order.company_id.id)
+            config = configs[order.company_id.id or self.env.company.id]
             
             if order.amount_total <= config.auto_approve_limit:
                 order.approval_level_required = 'auto'
@@ -101,81 +182,278 @@ class PurchaseOrder(models.Model):
                 order.approval_level_required = 'level2'
 
     def button_confirm(self):
+        notifications = defaultdict(lambda: self.browse())
+        events = []
+        configs = self.env['purchase.approval.config'].get_current_configs(self.company_id.ids)
         for order in self:
             if order.state not in ('draft', 'sent'):
                 continue
             
-            config = self.env['purchase.approval.config'].get_current_config(order.company_id.id)
+            config = configs[order.company_id.id]
             
             # Determine required approval level based on configuration
             if order.amount_total <= config.auto_approve_limit:
                 # Auto approve
                 order.state = 'purchase'
-                order._send_approval_notification('auto_approved')
+                notifications['auto_approved'] |= order
+                events.append(order._prepare_approval_event('auto', 'approve'))
             elif order.amount_total <= config.level1_approve_limit:
                 # Level 1 approval required
                 order.state = 'to_approve' 
-                order._send_approval_notification('level1_required')
+                order._reset_approval_escalation()
+                notifications['level1_required'] |= order
+                events.append(order._prepare_approval_event('level1', 'request'))
             else:
                 # Level 2 approval required
                 order.state = 'to_approve'
-                order._send_approval_notification('level2_required')
+                order._reset_approval_escalation()
+                notifications['level2_required'] |= order
+                events.append(order._prepare_approval_event('level2', 'request'))
         
+        self.env['purchase.approval.event']._log_events(events)
+        self._send_approval_notifications(notifications)
         return True
 
     def action_approve_level1(self):
         """Level 1 approval action"""
-        for order in self:
-            if not self.env.user.has_group('purchase_approval_workflow.group_purchase_level1_approver'):
-                raise AccessError(_("You don't have permission to approve Level 1 purchases"))
-            
-            if order.state != 'to_approve':
-                raise UserError(_("Order must be in 'To Approve' state"))
-            
-            config = self.env['purchase.approval.config'].get_current_config(order.company_id.id)
+        if self and not self.env.user.has_group('purchase_approval_workflow.group_purchase_level1_approver'):
+            raise AccessError(_("You don't have permission to approve Level 1 purchases"))
+        
+        orders, locked_orders = self._claim_approval_transition(
+            ('to_approve',), ('approved_level1', 'purchase', 'done'),
+            _("Order must be in 'To Approve' state"),
+        )
+        notifications = defaultdict(lambda: self.browse())
+        events = []
+        configs = self.env['purchase.approval.config'].get_current_configs(orders.company_id.ids)
+        for order in orders:
+            config = configs[order.company_id.id]
             
             order.level1_approver_id = self.env.user.id
             order.level1_approval_date = fields.Datetime.now()
+            order.level1_approval_hours = order._get_hours_since(order.approval_request_date, order.level1_approval_date)
+            events.append(order._prepare_approval_event('level1', 'approve', order.level1_approval_hours))
             
             if order.amount_total <= config.level1_approve_limit:
                 # Level 1 is sufficient
                 order.state = 'purchase'
-                order._send_approval_notification('level1_approved_final')
+                notifications['level1_approved_final'] |= order
             else:
                 # Level 2 still required
                 order.state = 'approved_level1'
-                order._send_approval_notification('level1_approved_pending_level2')
+                notifications['level1_approved_pending_level2'] |= order
+
+        self.env['purchase.approval.event']._log_events(events)
+        self._send_approval_notifications(notifications)
+        return locked_orders._get_locked_orders_warning()
 
     def action_approve_level2(self):
         """Level 2 approval action"""
-        for order in self:
-            if not self.env.user.has_group('purchase_approval_workflow.group_purchase_level2_approver'):
-                raise AccessError(_("You don't have permission to approve Level 2 purchases"))
-            
-            if order.state not in ('to_approve', 'approved_level1'):
-                raise UserError(_("Order must be in 'To Approve' or 'Level 1 Approved' state"))
-            
+        if self and not self.env.user.has_group('purchase_approval_workflow.group_purchase_level2_approver'):
+            raise AccessError(_("You don't have permission to approve Level 2 purchases"))
+        
+        orders, locked_orders = self._claim_approval_transition(
+            ('to_approve', 'approved_level1'), ('purchase', 'done'),
+            _("Order must be in 'To Approve' or 'Level 1 Approved' state"),
+        )
+        events = []
+        for order in orders:
             order.level2_approver_id = self.env.user.id
             order.level2_approval_date = fields.Datetime.now()
+            order.level2_approval_hours = order._get_hours_since(
+                order.level1_approval_date or order.approval_request_date,
+                order.level2_approval_date
+            )
             order.state = 'purchase'
-            order._send_approval_notification('level2_approved_final')
+            events.append(order._prepare_approval_event('level2', 'approve', order.level2_approval_hours))
+
+        self.env['purchase.approval.event']._log_events(events)
+        orders._send_approval_notification('level2_approved_final')
+        return locked_orders._get_locked_orders_warning()
 
     def action_reject(self):
         """Reject the purchase order and send back to draft"""
-        for order in self:
-            if order.state not in ('to_approve', 'approved_level1'):
-                raise UserError(_("Can only reject orders that are pending approval"))
-            
+        orders, locked_orders = self._claim_approval_transition(
+            ('to_approve', 'approved_level1'), (),
+            _("Can only reject orders that are pending approval"),
+        )
+        events = []
+        for order in orders:
+            events.append(order._prepare_approval_event(
+                order._get_pending_approval_level(),
+                'reject',
+                order._get_hours_since(order.level1_approval_date or order.approval_request_date, fields.Datetime.now())
+            ))
             order.state = 'draft'
             order.level1_approver_id = False
             order.level1_approval_date = False
             order.level2_approver_id = False
             order.level2_approval_date = False
-            order._send_approval_notification('rejected')
+            order.level1_approval_hours = 0.0
+            order.level2_approval_hours = 0.0
+            order._reset_approval_escalation(request_date=False)
+
+        self.env['purchase.approval.event']._log_events(events)
+        orders._send_approval_notification('rejected')
+        return locked_orders._get_locked_orders_warning()
+
+    def _claim_approval_transition(self, from_states, done_states, error_message):
+        """Lock the orders ready for an approval transition; returns (claimed orders, locked orders)
+
+        Orders already moved to one of ``done_states`` are left out, so that repeated clicks
+        apply the transition, log its event and notify only once. Orders row-locked by a
+        concurrent approval (``SKIP LOCKED``) are returned apart for the caller to report, since
+        the other transaction may still roll back. Any other state raises ``error_message``.
+        Under REPEATABLE READ, an approval committed after this transaction started still makes
+        the lock fail with a serialization error; the retried request then sees the new state.
+        """
+        if self.filtered(lambda order: order.state not in from_states + done_states):
+            raise UserError(error_message)
+        pending = self.filtered(lambda order: order.state in from_states)
+        if not pending:
+            return pending, pending
+        
+        pending.flush_recordset(['state'])
+        self.env.cr.execute("""
+            SELECT id
+              FROM purchase_order
+             WHERE id IN %s AND state IN %s
+               FOR UPDATE SKIP LOCKED
+        """, (tuple(pending.ids), tuple(from_states)))
+        claimed_ids = {row[0] for row in self.env.cr.fetchall()}
+        claimed = pending.filtered(lambda order: order.id in claimed_ids)
+        return claimed, pending - claimed
+
+    def _get_locked_orders_warning(self):
+        """Warning about orders skipped because another approval is processing them, if any"""
+        if not self:
+            return False
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Orders not processed"),
+                'message': _("%s are being processed by another approver and were left unchanged. "
+                             "Reload them to check their status.") % ', '.join(self.mapped('name')),
+                'type': 'warning',
+                'sticky': True,
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+    def _prepare_approval_event(self, level, action, duration_hours=0.0):
+        """Values of an approval event for the current user"""
+        self.ensure_one()
+        return {
+            'order_id': self.id,
+            'company_id': self.company_id.id,
+            'level': level,
+            'action': action,
+            'user_id': self.env.uid,
+            'date': fields.Datetime.now(),
+            'duration_hours': duration_hours,
+        }
+
+    def _reset_approval_escalation(self, request_date=None):
+        """Restart the approval clock and clear escalation counters"""
+        self.write({
+            'approval_request_date': fields.Datetime.now() if request_date is None else request_date,
+            'approval_reminder_count': 0,
+            'approval_last_reminder_date': False,
+            'approval_escalated': False,
+        })
+
+    @api.model
+    def _get_hours_since(self, start, end):
+        """Elapsed hours between two datetimes, 0 when the start is unknown"""
+        if not start or not end:
+            return 0.0
+        return max((end - start).total_seconds() / 3600.0, 0.0)
+
+    def _get_pending_approval_level(self):
+        """Approval level the order is currently waiting for"""
+        self.ensure_one()
+        if self.state == 'approved_level1' or self.approval_escalated or self.approval_level_required == 'level2':
+            return 'level2'
+        return 'level1'
+
+    @api.model
+    def _get_stalled_orders_domain(self, now=None):
+        """Domain of orders overdue for approval, using each company's reminder delay"""
+        now = now or fields.Datetime.now()
+        configs = self.env['purchase.approval.config'].search([('active', '=', True)])
+        domains = []
+        for company in configs.company_id:
+            config = configs.filtered(lambda c: c.company_id == company)[:1]
+            threshold = now - timedelta(hours=config.escalation_delay_hours)
+            domains.append([
+                ('company_id', '=', company.id),
+                '|',
+                '&', ('state', '=', 'to_approve'), ('approval_request_date', '<', threshold),
+                '&', ('state', '=', 'approved_level1'), ('level1_approval_date', '<', threshold),
+                '|',
+                ('approval_last_reminder_date', '=', False),
+                ('approval_last_reminder_date', '<', threshold),
+            ])
+        if not domains:
+            return [(0, '=', 1)]
+        return expression.OR(domains)
+
+    @api.model
+    def _cron_escalate_stalled_orders(self, batch_size=ESCALATION_BATCH_SIZE, time_limit=ESCALATION_TIME_LIMIT):
+        """Remind or escalate orders stuck in approval, in batches and within a time budget"""
+        deadline = time.monotonic() + time_limit
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        domain = self._get_stalled_orders_domain()
+        done = 0
+        while time.monotonic() < deadline:
+            orders = self.search(domain, limit=batch_size, order='approval_request_date, id')
+            if not orders:
+                break
+            orders._escalate_stalled_approval()
+            done += len(orders)
+            if auto_commit:
+                self.env.cr.commit()
+        remaining = self.search_count(domain)
+        _logger.info("Purchase approval escalation: %s order(s) processed, %s remaining", done, remaining)
+        self.env['ir.cron']._notify_progress(done=done, remaining=remaining)
+
+    def _escalate_stalled_approval(self):
+        """Send reminders to pending approvers, escalating to Level 2 after too many reminders"""
+        now = fields.Datetime.now()
+        notifications = defaultdict(lambda: self.browse())
+        events = []
+        configs = self.env['purchase.approval.config'].get_current_configs(self.company_id.ids)
+        for order in self:
+            config = configs[order.company_id.id]
+            if (
+                order.state == 'to_approve'
+                and order._get_pending_approval_level() == 'level1'
+                and order.approval_reminder_count >= config.escalation_max_reminders
+            ):
+                order.approval_escalated = True
+                notifications['approval_escalated'] |= order
+                events.append(order._prepare_approval_event(
+                    'level2', 'escalate', order._get_hours_since(order.approval_request_date, now)
+                ))
+            else:
+                notifications['approval_reminder'] |= order
+            order.approval_reminder_count += 1
+            order.approval_last_reminder_date = now
+
+        self.env['purchase.approval.event']._log_events(events)
+        self._send_approval_notifications(notifications)
+
+    @api.model
+    def _send_approval_notifications(self, notifications):
+        """Send the notifications collected by an approval action, one batch per stage"""
+        for notification_type, orders in notifications.items():
+            orders._send_approval_notification(notification_type)
 
     def _send_approval_notification(self, notification_type):
         """Send email notifications based on approval stage"""
-        self.ensure_one()
+        if not self:
+            return
         
         template_mapping = {
             'level1_required': 'purchase_approval_workflow.mail_template_level1_approval_request',
@@ -185,26 +463,54 @@ class PurchaseOrder(models.Model):
             'level2_approved_final': 'purchase_approval_workflow.mail_template_level2_approved',
             'auto_approved': 'purchase_approval_workflow.mail_template_auto_approved',
             'rejected': 'purchase_approval_workflow.mail_template_rejected',
+            'approval_reminder': 'purchase_approval_workflow.mail_template_approval_reminder',
+            'approval_escalated': 'purchase_approval_workflow.mail_template_approval_escalated',
         }
         
         template_id = template_mapping.get(notification_type)
         if template_id:
-            try:
-                template = self.env.ref(template_id)
-                if template:
-                    template.send_mail(self.id, force_send=True)
-            except Exception:
-                # Template not found, continue without sending email
-                pass
+            # Template not found, continue without sending email
+            template = self.env.ref(template_id, raise_if_not_found=False)
+            if template:
+                # Resolve approvers once per (company, level) and render the whole batch
+                batches = defaultdict(lambda: self.browse())
+                for order in self:
+                    level = order._get_notification_approval_level(notification_type)
+                    batches[order.company_id.id, level] |= order
+                for (company_id, level), orders in batches.items():
+                    partner_ids = self.get_approval_users(level, company_id).partner_id.ids if level else []
+                    template.with_context(
+                        approval_partner_to=','.join(str(partner_id) for partner_id in partner_ids),
+                    ).send_mail_batch(orders.ids, force_send=True)
+
+    def _get_notification_approval_level(self, notification_type):
+        """Approval level whose approvers receive the given notification, if any"""
+        self.ensure_one()
+        if notification_type == 'level1_required':
+            return 'level1'
+        if notification_type in ('level2_required', 'level1_approved_pending_level2', 'approval_escalated'):
+            return 'level2'
+        if notification_type == 'approval_reminder':
+            return self._get_pending_approval_level()
+        return False
 
     @api.model
-    def get_approval_users(self, approval_level):
+    def get_approval_users(self, approval_level, company_id=None):
         """Get users who can approve at the specified level"""
+        return self.env['res.users'].browse(self._get_approval_user_ids(approval_level, company_id))
+
+    @api.model
+    @tools.ormcache('approval_level', 'company_id')
+    def _get_approval_user_ids(self, approval_level, company_id):
+        """Active approver ids for a level, optionally restricted to a company (cached)"""
         if approval_level == 'level1':
             group = self.env.ref('purchase_approval_workflow.group_purchase_level1_approver')
         elif approval_level == 'level2':
             group = self.env.ref('purchase_approval_workflow.group_purchase_level2_approver')
         else:
-            return self.env['res.users']
+            return ()
         
-        return group.users
\ No newline at end of file
+        users = group.sudo().users.filtered('active')
+        if company_id:
+            users = users.filtered(lambda user: company_id in user.company_ids.ids)
+        return tuple(users.ids)
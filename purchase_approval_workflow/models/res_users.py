@@ -0,0 +1,48 @@
+from odoo import models, api
+
+APPROVER_GROUPS = (
+    'purchase_approval_workflow.group_purchase_level1_approver',
+    'purchase_approval_workflow.group_purchase_level2_approver',
+)
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        users = super().create(vals_list)
+        if users._has_purchase_approver():
+            self.env.registry.clear_cache()
+        return users
+
+    def write(self, vals):
+        result = super().write(vals)
+        # Approver sets depend on group membership, activity and allowed companies
+        if {'groups_id', 'active', 'company_ids'} & set(vals):
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        clear_cache = self._has_purchase_approver()
+        result = super().unlink()
+        if clear_cache:
+            self.env.registry.clear_cache()
+        return result
+
+    def _has_purchase_approver(self):
+        """Whether any of these users belongs to a purchase approver group"""
+        approver_groups = self.env['res.groups']
+        for xmlid in APPROVER_GROUPS:
+            approver_groups |= self.env.ref(xmlid, raise_if_not_found=False) or self.env['res.groups']
+        return bool(self.sudo().groups_id & approver_groups)
+
+
+class ResGroups(models.Model):
+    _inherit = 'res.groups'
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {'users', 'implied_ids'} & set(vals):
+            self.env.registry.clear_cache()
+        return result
\ No newline at end of file
@@ -0,0 +1 @@
+from . import test_purchase_approval_routing
\ No newline at end of file
@@ -0,0 +1,210 @@
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase, new_test_user
+
+# Extra SQL queries allowed per additional order once the per-batch work is done.
+# A per-record search (config lookup, group resolution, ...) adds at least one query
+# per order and breaks these budgets.
+CONFIRM_QUERIES_PER_ORDER = 2
+RECOMPUTE_QUERIES_PER_ORDER = 0
+
+
+@tagged('post_install', '-at_install')
+class TestPurchaseApprovalRouting(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.company_a = cls.env.company
+        cls.company_b = cls.env['res.company'].create({'name': 'Approval Company B'})
+        # Existing configurations (e.g. the default one created at install) would take precedence
+        cls.env['purchase.approval.config'].search([]).active = False
+        cls.configs = cls.env['purchase.approval.config'].create([{
+            'name': 'Approval Config %s' % company.name,
+            'company_id': company.id,
+            'auto_approve_limit': 5000.0,
+            'level1_approve_limit': 20000.0,
+        } for company in cls.company_a | cls.company_b])
+        cls.vendor = cls.env['res.partner'].create({'name': 'Approval Vendor', 'is_company': True})
+        cls.product = cls.env['product.product'].create({
+            'name': 'Approval Product',
+            'type': 'consu',
+            'supplier_taxes_id': [(5, 0, 0)],
+        })
+        cls.approver = new_test_user(
+            cls.env,
+            login='purchase_approver',
+            company_ids=(cls.company_a | cls.company_b).ids,
+            groups='purchase.group_purchase_manager,'
+                   'purchase_approval_workflow.group_purchase_level1_approver,'
+                   'purchase_approval_workflow.group_purchase_level2_approver',
+        )
+
+    def _create_orders(self, count, amount, companies=None):
+        """Create ``count`` draft orders of ``amount`` spread over ``companies``"""
+        companies = companies or self.company_a
+        return self.env['purchase.order'].create([{
+            'partner_id': self.vendor.id,
+            'company_id': companies[index % len(companies)].id,
+            'order_line': [(0, 0, {
+                'product_id': self.product.id,
+                'product_qty': 1,
+                'price_unit': amount,
+            })],
+        } for index in range(count)])
+
+    def _count_queries(self, func):
+        """Number of SQL queries run by ``func`` including the final flush"""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.env.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - start
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def test_confirm_routes_by_amount(self):
+        auto_order = self._create_orders(1, 1000.0)
+        level1_order = self._create_orders(1, 10000.0)
+        level2_order = self._create_orders(1, 50000.0)
+        orders = auto_order | level1_order | level2_order
+        
+        self.assertEqual(orders.mapped('approval_level_required'), ['auto', 'level1', 'level2'])
+        orders.button_confirm()
+        self.assertEqual(auto_order.state, 'purchase')
+        self.assertEqual(level1_order.state, 'to_approve')
+        self.assertEqual(level2_order.state, 'to_approve')
+        self.assertTrue(level1_order.approval_request_date)
+        self.assertEqual(
+            set(orders.approval_event_ids.mapped(lambda event: (event.order_id, event.level, event.action))),
+            {(level2_order, 'level2', 'request'), (level1_order, 'level1', 'request'), (auto_order, 'auto', 'approve')},
+        )
+
+    def test_approval_levels(self):
+        level1_order = self._create_orders(1, 10000.0)
+        level2_order = self._create_orders(1, 50000.0)
+        (level1_order | level2_order).button_confirm()
+        
+        (level1_order | level2_order).with_user(self.approver).action_approve_level1()
+        self.assertEqual(level1_order.state, 'purchase')
+        self.assertEqual(level2_order.state, 'approved_level1')
+        self.assertEqual(level2_order.level1_approver_id, self.approver)
+        
+        level2_order.with_user(self.approver).action_approve_level2()
+        self.assertEqual(level2_order.state, 'purchase')
+        self.assertEqual(level2_order.level2_approver_id, self.approver)
+        self.assertEqual(
+            level2_order.approval_event_ids.filtered(lambda event: event.action == 'approve').mapped('level'),
+            ['level2', 'level1'],
+        )
+
+    def test_reject_keeps_history(self):
+        order = self._create_orders(1, 50000.0)
+        order.button_confirm()
+        order.with_user(self.approver).action_approve_level1()
+        order.with_user(self.approver).action_reject()
+        
+        self.assertEqual(order.state, 'draft')
+        self.assertFalse(order.level1_approver_id)
+        self.assertEqual(order.approval_event_ids.mapped('action'), ['reject', 'approve', 'request'])
+        with self.assertRaises(UserError):
+            order.approval_event_ids.unlink()
+
+    def test_repeated_approval_is_idempotent(self):
+        order = self._create_orders(1, 50000.0)
+        order.button_confirm()
+        sent = []
+        with patch.object(self.registry['purchase.order'], '_send_approval_notification',
+                          lambda orders, notification_type: orders and sent.append((orders, notification_type))):
+            order.with_user(self.approver).action_approve_level1()
+            order.with_user(self.approver).action_approve_level1()
+            order.with_user(self.approver).action_approve_level2()
+            order.with_user(self.approver).action_approve_level2()
+
+        self.assertEqual(order.state, 'purchase')
+        self.assertEqual(order.approval_event_ids.mapped('action'), ['approve', 'approve', 'request'])
+        self.assertEqual(sent, [(order, 'level1_approved_pending_level2'), (order, 'level2_approved_final')])
+        with self.assertRaises(UserError):
+            order.with_user(self.approver).action_reject()
+
+    def test_reject_requires_pending_order(self):
+        order = self._create_orders(1, 50000.0)
+        with self.assertRaises(UserError):
+            order.with_user(self.approver).action_reject()
+
+        order.button_confirm()
+        self.assertFalse(order.with_user(self.approver).action_reject())
+        with self.assertRaises(UserError):
+            order.with_user(self.approver).action_reject()
+
+    def test_reminders_follow_required_level(self):
+        self.configs.escalation_max_reminders = 0
+        level1_order = self._create_orders(1, 10000.0)
+        level2_order = self._create_orders(1, 50000.0)
+        (level1_order | level2_order).button_confirm()
+        sent = []
+        with patch.object(self.registry['purchase.order'], '_send_approval_notification',
+                          lambda orders, notification_type: sent.append((orders, notification_type))):
+            (level1_order | level2_order)._escalate_stalled_approval()
+
+        self.assertTrue(level1_order.approval_escalated)
+        self.assertFalse(level2_order.approval_escalated)
+        self.assertEqual(sent, [(level1_order, 'approval_escalated'), (level2_order, 'approval_reminder')])
+        self.assertEqual(level2_order._get_notification_approval_level('approval_reminder'), 'level2')
+
+    def test_per_company_configuration(self):
+        self.configs.filtered(lambda config: config.company_id == self.company_b).level1_approve_limit = 8000.0
+        orders = self._create_orders(2, 10000.0, self.company_a | self.company_b)
+        self.assertEqual(orders.mapped('approval_level_required'), ['level1', 'level2'])
+
+    # ------------------------------------------------------------------
+    # Query count budgets
+    # ------------------------------------------------------------------
+
+    def test_confirm_query_scaling(self):
+        """Confirming more orders only costs the per-order writes, never per-order lookups"""
+        companies = self.company_a | self.company_b
+        counts = {}
+        with patch.object(self.registry['purchase.order'], '_send_approval_notification', lambda orders, notification_type: None):
+            for size in (10, 50):
+                orders = self._create_orders(size // 2, 1000.0, companies) | self._create_orders(size // 2, 30000.0, companies)
+                counts[size] = self._count_queries(orders.button_confirm)
+        
+        self.assertLessEqual(
+            counts[50] - counts[10], 40 * CONFIRM_QUERIES_PER_ORDER,
+            "Confirming 40 more orders ran %s more queries" % (counts[50] - counts[10]),
+        )
+
+    def test_confirm_query_count(self):
+        orders = self._create_orders(10, 10000.0, self.company_a | self.company_b)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        with patch.object(self.registry['purchase.order'], '_send_approval_notification', lambda orders, notification_type: None), \
+                self.assertQueryCount(25):
+            orders.button_confirm()
+
+    def test_recompute_query_scaling(self):
+        """Recomputing the approval level resolves the configurations once per batch"""
+        companies = self.company_a | self.company_b
+        counts = {}
+        for size in (10, 100):
+            orders = self._create_orders(size, 10000.0, companies)
+            counts[size] = self._count_queries(orders._compute_approval_level)
+        
+        self.assertLessEqual(
+            counts[100] - counts[10], 90 * RECOMPUTE_QUERIES_PER_ORDER,
+            "Recomputing 90 more orders ran %s more queries" % (counts[100] - counts[10]),
+        )
+
+    def test_recompute_query_count(self):
+        orders = self._create_orders(20, 10000.0, self.company_a | self.company_b)
+        self.env.flush_all()
+        self.env.invalidate_all()
+        with self.assertQueryCount(6):
+            orders._compute_approval_level()
@@ -1 +1,6 @@
-from . import models
\ No newline at end of file
+from . import models
+
+
+def _setup_advance_payment_accounts(env):
+    env['res.company'].search([('chart_template', '!=', False)])._setup_advance_payment_accounts()
+    env['sale.advance.balance']._rebuild_balances()
\ No newline at end of file
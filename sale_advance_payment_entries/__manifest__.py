@@ -14,6 +14,11 @@ Features:
 - Link journal entries to sales orders
 - Activity logging in order chatter
 - Integration with existing sales and accounting workflows
+- Per-company advance payment account and journal in the Accounting settings
+- Automatic consumption and reconciliation of advances against posted invoices
+- Consumed advances released again when invoices are reset to draft or cancelled, and by the amount credited on credit notes
+- Per-customer ledger of unconsumed advance payments
+- Background backfill of advance entries for historical confirmed orders
 
 Accounting Flow:
 - When a sales order is confirmed with an advance payment amount
@@ -27,9 +32,15 @@ Accounting Flow:
     'website': '',
     'depends': ['base', 'sale', 'account', 'sale_management'],
     'data': [
+        'security/ir.model.access.csv',
+        'security/sale_advance_balance_security.xml',
+        'data/ir_cron_data.xml',
         'views/sale_order_views.xml',
+        'views/res_config_settings_views.xml',
+        'views/sale_advance_balance_views.xml',
     ],
     'demo': [],
+    'post_init_hook': '_setup_advance_payment_accounts',
     'installable': True,
     'application': False,
     'auto_install': False,
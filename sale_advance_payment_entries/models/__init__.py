@@ -1 +1,7 @@
+from . import res_company
+from . import res_config_settings
+from . import res_partner
+from . import account_chart_template
+from . import account_move
+from . import sale_advance_balance
 from . import sale_order
\ No newline at end of file
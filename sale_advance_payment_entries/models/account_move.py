@@ -0,0 +1,228 @@
+from collections import defaultdict
+
+from markupsafe import Markup
+
+from odoo import models, fields, _
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    advance_order_id = fields.Many2one(
+        'sale.order',
+        string='Advance Payment Order',
+        readonly=True,
+        copy=False,
+        index='btree_not_null',
+        help="Sales order whose advance payment this entry records or consumes"
+    )
+    
+    advance_move_kind = fields.Selection([
+        ('advance', 'Advance Payment'),
+        ('consumption', 'Advance Consumption'),
+    ], string='Advance Entry Type', readonly=True, copy=False)
+    
+    advance_invoice_id = fields.Many2one(
+        'account.move',
+        string='Advance Consumed By',
+        readonly=True,
+        copy=False,
+        index='btree_not_null',
+        help="Customer invoice an advance consumption entry was applied to"
+    )
+
+    def _post(self, soft=True):
+        posted = super()._post(soft)
+        Balance = self.env['sale.advance.balance']
+        Balance._apply_deltas(Balance._get_move_deltas(posted))
+        # A credit note gives back the part of the advances its invoice no longer needs
+        refunded_invoices = posted.filtered(lambda move: move.move_type == 'out_refund').reversed_entry_id
+        if refunded_invoices:
+            refunded_invoices._rebalance_advance_payments()
+        invoices = posted.filtered(lambda move: move.move_type == 'out_invoice')
+        if invoices:
+            invoices._reconcile_advance_payments()
+        return posted
+
+    def button_draft(self):
+        # Entries leaving the posted state no longer count in the advance balances
+        Balance = self.env['sale.advance.balance']
+        posted = self.filtered(lambda move: move.state == 'posted')
+        deltas = Balance._get_move_deltas(posted, sign=-1)
+        result = super().button_draft()
+        Balance._apply_deltas(deltas)
+        # Invoices reset to draft (or cancelled) give their consumed advances back
+        invoices = posted.filtered(lambda move: move.move_type == 'out_invoice')
+        if invoices:
+            invoices._release_advance_payments()
+        # Credit notes reset to draft let their invoices consume the advances again
+        refunded_invoices = posted.filtered(lambda move: move.move_type == 'out_refund').reversed_entry_id.filtered(
+            lambda move: move.state == 'posted'
+        )
+        if refunded_invoices:
+            refunded_invoices._reconcile_advance_payments()
+        return result
+
+    def _is_active_advance_move(self):
+        """Whether this entry is posted and not cancelled by a posted reversal"""
+        self.ensure_one()
+        return self.state == 'posted' and not self.reversal_move_ids.filtered(lambda move: move.state == 'posted')
+
+    def _get_active_advance_consumptions(self):
+        """Posted, unreversed advance consumption entries applied to these invoices"""
+        return self.env['account.move'].search([
+            ('advance_invoice_id', 'in', self.ids),
+            ('advance_move_kind', '=', 'consumption'),
+            ('state', '=', 'posted'),
+        ]).filtered(lambda move: move._is_active_advance_move())
+
+    def _get_advance_open_amounts(self):
+        """Amount of each invoice the advances may still cover: its total net of posted credit notes and consumptions"""
+        consumed = defaultdict(float)
+        for move in self._get_active_advance_consumptions():
+            consumed[move.advance_invoice_id] += sum(move.line_ids.mapped('debit'))
+        return {
+            invoice: abs(invoice.amount_total_signed) - consumed[invoice] - sum(
+                abs(refund.amount_total_signed) for refund in invoice.reversal_move_ids if refund.state == 'posted'
+            )
+            for invoice in self
+        }
+
+    def _rebalance_advance_payments(self):
+        """Release the advances these invoices consumed beyond their amount net of credit notes"""
+        open_amounts = self._get_advance_open_amounts()
+        overconsumed = self.filtered(
+            lambda invoice: invoice.company_id.currency_id.compare_amounts(open_amounts[invoice], 0.0) < 0
+        )
+        if not overconsumed:
+            return
+        # Release everything, then consume again up to what the credit notes left open
+        overconsumed._release_advance_payments()
+        overconsumed.filtered(lambda invoice: invoice.state == 'posted')._reconcile_advance_payments()
+
+    def _release_advance_payments(self):
+        """Reverse the advance consumption entries of these invoices, making the advances available again"""
+        consumption_moves = self._get_active_advance_consumptions()
+        if not consumption_moves:
+            return self.env['account.move']
+        
+        # Detach the consumptions from the invoices, then cancel them with reconciled reversals
+        consumption_moves.line_ids.filtered('reconciled').remove_move_reconcile()
+        reversals = consumption_moves._reverse_moves(
+            default_values_list=[{
+                'date': fields.Date.context_today(move),
+                'ref': _('Reversal of: %s') % move.name,
+            } for move in consumption_moves],
+            cancel=True,
+        )
+        
+        # Log in chatter
+        bodies = defaultdict(list)
+        for move in consumption_moves:
+            bodies[move.advance_order_id.id].append(_("Advance payment of %s %s released from invoice %s (%s)") % (
+                sum(move.line_ids.mapped('debit')),
+                move.company_id.currency_id.name,
+                move.advance_invoice_id.name,
+                move.name
+            ))
+        self.env['sale.order'].browse(list(bodies))._message_log_batch(
+            bodies={order_id: Markup('<br/>').join(lines) for order_id, lines in bodies.items()},
+            subtype_id=self.env['ir.model.data']._xmlid_to_res_id('mail.mt_note'),
+        )
+        return reversals
+
+    def _reconcile_advance_payments(self):
+        """Consume the advance payments of the invoiced orders against the invoices receivable"""
+        orders = self.line_ids.sale_line_ids.order_id.filtered(
+            lambda order: order.advance_residual > 0
+        )
+        if not orders:
+            return self.env['account.move']
+        
+        # Allocate each order's remaining advance over its invoices, oldest first
+        remaining = {order: order.advance_residual for order in orders}
+        consumable = self._get_advance_open_amounts()
+        move_vals_list = []
+        allocations = []
+        for invoice in self.sorted('id'):
+            receivable_lines = invoice.line_ids.filtered(
+                lambda line: line.account_id.account_type == 'asset_receivable' and not line.reconciled
+            )
+            # Unreconciled credit notes do not lower the residual but still reduce what the advance may cover
+            open_amount = min(sum(receivable_lines.mapped('amount_residual')), consumable[invoice])
+            for order in invoice.line_ids.sale_line_ids.order_id & orders:
+                amount = invoice.company_id.currency_id.round(min(remaining[order], open_amount))
+                if invoice.company_id.currency_id.compare_amounts(amount, 0.0) <= 0:
+                    continue
+                remaining[order] -= amount
+                open_amount -= amount
+                move_vals_list.append(invoice._prepare_advance_consumption_move_vals(
+                    order, receivable_lines[0].account_id, amount
+                ))
+                allocations.append((order, invoice, amount))
+        
+        if not move_vals_list:
+            return self.env['account.move']
+        
+        # One consumption entry per (order, invoice), created and posted together
+        consumption_moves = self.env['account.move'].create(move_vals_list)
+        consumption_moves.action_post()
+        
+        # Reconcile each invoice with all the consumption entries it absorbed
+        plan = defaultdict(lambda: self.env['account.move.line'])
+        for (order, invoice, amount), move in zip(allocations, consumption_moves):
+            plan[invoice] |= move.line_ids.filtered(lambda line: line.account_id.account_type == 'asset_receivable')
+        for invoice in plan:
+            plan[invoice] |= invoice.line_ids.filtered(
+                lambda line: line.account_id.account_type == 'asset_receivable' and not line.reconciled
+            )
+        self.env['account.move.line']._reconcile_plan(list(plan.values()))
+        
+        # Log in chatter
+        bodies = defaultdict(list)
+        for (order, invoice, amount), move in zip(allocations, consumption_moves):
+            bodies[order.id].append(_("Advance payment of %s %s consumed by invoice %s (%s)") % (
+                amount,
+                invoice.company_id.currency_id.name,
+                invoice.name,
+                move.name
+            ))
+        self.env['sale.order'].browse(list(bodies))._message_log_batch(
+            bodies={order_id: Markup('<br/>').join(lines) for order_id, lines in bodies.items()},
+            subtype_id=self.env['ir.model.data']._xmlid_to_res_id('mail.mt_note'),
+        )
+        return consumption_moves
+
+    def _prepare_advance_consumption_move_vals(self, order, receivable_account, amount):
+        """Prepare the entry moving an advance payment from the advance account to the receivable"""
+        self.ensure_one()
+        advance_move = order.advance_journal_entry_id
+        advance_account = advance_move.line_ids.filtered(lambda line: line.credit)[:1].account_id
+        return {
+            'move_type': 'entry',
+            'journal_id': advance_move.journal_id.id,
+            'partner_id': self.commercial_partner_id.id,
+            'date': fields.Date.context_today(self),
+            'ref': _('Advance Consumption for %s on %s') % (order.name, self.name),
+            'advance_order_id': order.id,
+            'advance_move_kind': 'consumption',
+            'advance_invoice_id': self.id,
+            'line_ids': [
+                # Debit: Advance Received
+                (0, 0, {
+                    'name': _('Advance Consumed - %s') % order.name,
+                    'account_id': advance_account.id,
+                    'partner_id': self.commercial_partner_id.id,
+                    'debit': amount,
+                    'credit': 0.0,
+                }),
+                # Credit: Customer Receivable
+                (0, 0, {
+                    'name': _('Advance Applied - %s') % self.name,
+                    'account_id': receivable_account.id,
+                    'partner_id': self.commercial_partner_id.id,
+                    'debit': 0.0,
+                    'credit': amount,
+                }),
+            ],
+        }
@@ -0,0 +1,60 @@
+from odoo import models, fields, api, tools
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    advance_payment_account_id = fields.Many2one(
+        'account.account',
+        string='Advance Payment Account',
+        domain=[('account_type', '=', 'liability_current')],
+        help="Liability account credited when an advance payment is recorded on a sales order"
+    )
+    
+    advance_payment_journal_id = fields.Many2one(
+        'account.journal',
+        string='Advance Payment Journal',
+        domain=[('type', '=', 'general')],
+        help="Journal used for advance payment entries"
+    )
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {'advance_payment_account_id', 'advance_payment_journal_id'} & set(vals):
+            self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_advance_payment_config(self, company_id):
+        """Configured (account id, journal id) for advance payments of a company (cached)"""
+        company = self.sudo().browse(company_id)
+        return company.advance_payment_account_id.id, company.advance_payment_journal_id.id
+
+    def _setup_advance_payment_accounts(self):
+        """Find or create the advance payment account and journal of companies missing them"""
+        for company in self:
+            vals = {}
+            if not company.advance_payment_account_id:
+                Account = self.env['account.account'].with_company(company)
+                advance_account = Account.search([
+                    *Account._check_company_domain(company),
+                    ('code', '=', '2010'),
+                ], limit=1)
+                if not advance_account:
+                    advance_account = Account.create({
+                        'name': 'Advance Payments from Customers',
+                        'code': '2010',
+                        'account_type': 'liability_current',
+                    })
+                vals['advance_payment_account_id'] = advance_account.id
+            if not company.advance_payment_journal_id:
+                Journal = self.env['account.journal'].with_company(company)
+                journal = Journal.search([
+                    *Journal._check_company_domain(company),
+                    ('type', '=', 'general'),
+                ], limit=1)
+                if journal:
+                    vals['advance_payment_journal_id'] = journal.id
+            if vals:
+                company.write(vals)
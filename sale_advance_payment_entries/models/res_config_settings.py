@@ -0,0 +1,36 @@
+from odoo import models, fields, api
+
+
+class ResConfigSettings(models.TransientModel):
+    _inherit = 'res.config.settings'
+
+    advance_payment_account_id = fields.Many2one(
+        'account.account',
+        related='company_id.advance_payment_account_id',
+        readonly=False,
+        check_company=True
+    )
+    
+    advance_payment_journal_id = fields.Many2one(
+        'account.journal',
+        related='company_id.advance_payment_journal_id',
+        readonly=False,
+        check_company=True
+    )
+
+    
+    advance_backfill_pending_count = fields.Integer(
+        string='Orders Missing Advance Entries',
+        compute='_compute_advance_backfill_pending_count'
+    )
+
+    @api.depends('company_id')
+    def _compute_advance_backfill_pending_count(self):
+        for settings in self:
+            settings.advance_backfill_pending_count = self.env['sale.order'].search_count(
+                self.env['sale.order']._get_advance_backfill_domain() + [('company_id', '=', settings.company_id.id)]
+            )
+
+    def action_run_advance_backfill(self):
+        """Button action to start the advance payment backfill"""
+        self.env['sale.order'].action_run_advance_backfill()
\ No newline at end of file
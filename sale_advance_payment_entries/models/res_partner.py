@@ -0,0 +1,23 @@
+from odoo import models, fields
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    advance_balance = fields.Monetary(
+        string='Unconsumed Advance',
+        compute='_compute_advance_balance',
+        currency_field='advance_balance_currency_id',
+        help="Advance payments recorded for this customer in the current company and not yet applied to invoices"
+    )
+    advance_balance_currency_id = fields.Many2one('res.currency', compute='_compute_advance_balance')
+
+    def _compute_advance_balance(self):
+        balances = self.env['sale.advance.balance'].sudo().search([
+            ('partner_id', 'in', self.commercial_partner_id.ids),
+            ('company_id', '=', self.env.company.id),
+        ])
+        balance_by_partner = {balance.partner_id.id: balance.balance for balance in balances}
+        for partner in self:
+            partner.advance_balance = balance_by_partner.get(partner.commercial_partner_id.id, 0.0)
+            partner.advance_balance_currency_id = self.env.company.currency_id
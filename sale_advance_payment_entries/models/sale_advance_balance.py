@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError
+
+
+class SaleAdvanceBalance(models.Model):
+    _name = 'sale.advance.balance'
+    _description = 'Customer Advance Payment Balance'
+    _order = 'balance desc, id'
+    _rec_name = 'partner_id'
+
+    partner_id = fields.Many2one('res.partner', string='Customer', required=True, readonly=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True, ondelete='cascade')
+    currency_id = fields.Many2one(related='company_id.currency_id', string='Currency')
+    
+    amount_advanced = fields.Monetary(string='Advances Recorded', readonly=True)
+    amount_consumed = fields.Monetary(string='Advances Consumed', readonly=True)
+    balance = fields.Monetary(string='Unconsumed Advance', readonly=True)
+
+    _sql_constraints = [
+        ('partner_company_uniq', 'unique(partner_id, company_id)',
+         'There can only be one advance balance per customer and company.'),
+    ]
+
+    @api.model
+    def _get_move_deltas(self, moves, sign=1):
+        """Ledger deltas {(partner, company): [advanced, consumed]} of posting (or unposting) advance moves"""
+        deltas = defaultdict(lambda: [0.0, 0.0])
+        for move in moves:
+            kind = move.advance_move_kind
+            move_sign = sign
+            if not kind and move.reversed_entry_id.advance_move_kind:
+                # A reversal cancels the move it reverses
+                kind = move.reversed_entry_id.advance_move_kind
+                move_sign = -sign
+            if not kind or not move.partner_id:
+                continue
+            amount = sum(move.line_ids.mapped('debit')) * move_sign
+            key = (move.partner_id.commercial_partner_id.id, move.company_id.id)
+            deltas[key][0 if kind == 'advance' else 1] += amount
+        return deltas
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """Add deltas to the ledger with a single upsert"""
+        rows = [(partner_id, company_id, advanced, consumed) for (partner_id, company_id), (advanced, consumed) in deltas.items()
+                if advanced or consumed]
+        if not rows:
+            return
+        self.env.cr.execute("""
+            INSERT INTO sale_advance_balance
+                (partner_id, company_id, amount_advanced, amount_consumed, balance,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.partner_id, v.company_id, v.advanced, v.consumed, v.advanced - v.consumed,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(partner_ids)s::int[], %(company_ids)s::int[], %(advanced)s::numeric[], %(consumed)s::numeric[])
+                AS v(partner_id, company_id, advanced, consumed)
+            ON CONFLICT (partner_id, company_id) DO UPDATE SET
+                amount_advanced = sale_advance_balance.amount_advanced + EXCLUDED.amount_advanced,
+                amount_consumed = sale_advance_balance.amount_consumed + EXCLUDED.amount_consumed,
+                balance = sale_advance_balance.balance + EXCLUDED.balance,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, {
+            'uid': self.env.uid,
+            'partner_ids': [row[0] for row in rows],
+            'company_ids': [row[1] for row in rows],
+            'advanced': [row[2] for row in rows],
+            'consumed': [row[3] for row in rows],
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_balances(self):
+        """Recompute the whole ledger from posted advance and consumption entries"""
+        self.env['account.move'].flush_model()
+        self.env['account.move.line'].flush_model(['move_id', 'debit'])
+        self.env.cr.execute("DELETE FROM sale_advance_balance")
+        self.env.cr.execute("""
+            WITH advance_moves AS (
+                SELECT move.id,
+                       move.company_id,
+                       partner.commercial_partner_id AS partner_id,
+                       COALESCE(move.advance_move_kind, reversed.advance_move_kind) AS kind,
+                       CASE WHEN move.advance_move_kind IS NULL THEN -1 ELSE 1 END AS sign
+                  FROM account_move move
+                  JOIN res_partner partner ON partner.id = move.partner_id
+             LEFT JOIN account_move reversed ON reversed.id = move.reversed_entry_id
+                 WHERE move.state = 'posted'
+                   AND (move.advance_move_kind IS NOT NULL OR reversed.advance_move_kind IS NOT NULL)
+            ), amounts AS (
+                SELECT advance_moves.partner_id,
+                       advance_moves.company_id,
+                       SUM(CASE WHEN kind = 'advance' THEN sign * line.debit ELSE 0 END) AS advanced,
+                       SUM(CASE WHEN kind = 'consumption' THEN sign * line.debit ELSE 0 END) AS consumed
+                  FROM advance_moves
+                  JOIN account_move_line line ON line.move_id = advance_moves.id
+              GROUP BY advance_moves.partner_id, advance_moves.company_id
+            )
+            INSERT INTO sale_advance_balance
+                (partner_id, company_id, amount_advanced, amount_consumed, balance,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT partner_id, company_id, advanced, consumed, advanced - consumed,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM amounts
+        """, {'uid': self.env.uid})
+        self.invalidate_model()
+
+    def action_rebuild_balances(self):
+        """Button action to rebuild the advance balance ledger"""
+        if not self.env.user.has_group('account.group_account_manager'):
+            raise AccessError(_("Only accounting managers can rebuild the advance balances"))
+        self._rebuild_balances()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _("Advance balances rebuilt"),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
@@ -1,7 +1,18 @@
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+import logging
+import threading
+import time
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError, ValidationError
 from markupsafe import Markup
 
+_logger = logging.getLogger(__name__)
+
+# Backfill cron limits: orders handled per committed chunk and wall time per run (seconds)
+BACKFILL_BATCH_SIZE = 200
+BACKFILL_TIME_LIMIT = 300
+BACKFILL_CURSOR_PARAM = 'sale_advance_payment_entries.backfill_last_id'
+
 
 class SaleOrder(models.Model):
     _inherit = 'sale.order'
@@ -24,6 +35,51 @@ class SaleOrder(models.Model):
         ('recorded', 'Advance Payment Recorded'),
     ], string='Advance Payment State', default='none', readonly=True)
 
+    advance_move_ids = fields.One2many(
+        'account.move',
+        'advance_order_id',
+        string='Advance Entries',
+        readonly=True
+    )
+    
+    advance_consumed_amount = fields.Float(
+        string='Advance Consumed',
+        compute='_compute_advance_consumed_amount',
+        help="Part of the advance payment applied to posted customer invoices by consumption entries not reversed"
+    )
+    
+    advance_residual = fields.Float(
+        string='Advance Remaining',
+        compute='_compute_advance_residual',
+        help="Advance payment not yet applied to customer invoices"
+    )
+
+    @api.depends(
+        'advance_move_ids.state',
+        'advance_move_ids.advance_move_kind',
+        'advance_move_ids.line_ids.debit',
+        'advance_move_ids.reversal_move_ids.state',
+    )
+    def _compute_advance_consumed_amount(self):
+        for order in self:
+            consumption_moves = order.advance_move_ids.filtered(
+                lambda move: move.advance_move_kind == 'consumption' and move._is_active_advance_move()
+            )
+            order.advance_consumed_amount = sum(consumption_moves.line_ids.mapped('debit'))
+
+    @api.depends(
+        'advance_payment',
+        'advance_consumed_amount',
+        'advance_journal_entry_id.state',
+        'advance_journal_entry_id.reversal_move_ids.state',
+    )
+    def _compute_advance_residual(self):
+        for order in self:
+            if order.advance_journal_entry_id and order.advance_journal_entry_id._is_active_advance_move():
+                order.advance_residual = order.advance_payment - order.advance_consumed_amount
+            else:
+                order.advance_residual = 0.0
+
     @api.onchange('advance_payment')
     def _onchange_advance_payment(self):
         """Update advance payment state based on amount"""
@@ -34,41 +90,88 @@ class SaleOrder(models.Model):
             else:
                 order.advance_payment_state = 'none'
 
+    def init(self):
+        super().init()
+        # Partial index serving the backfill of confirmed orders missing their advance entry
+        tools.create_index(
+            self._cr, 'sale_order_advance_backfill_index', self._table, ['id'],
+            where="advance_payment > 0 AND advance_journal_entry_id IS NULL AND state = 'sale'"
+        )
+
     def action_confirm(self):
         """Override to generate advance payment journal entry"""
         result = super().action_confirm()
         
-        for order in self:
-            if order.advance_payment > 0 and not order.advance_journal_entry_id:
-                order._create_advance_payment_entry()
+        orders = self.filtered(lambda order: order.advance_payment > 0 and not order.advance_journal_entry_id)
+        orders._create_advance_payment_entries()
         
         return result
 
     def _create_advance_payment_entry(self):
         """Create journal entry for advance payment"""
         self.ensure_one()
+        self._create_advance_payment_entries()
+
+    def _create_advance_payment_entries(self):
+        """Create and post advance payment journal entries for all orders at once"""
+        orders = self.filtered(lambda order: order.advance_payment > 0)
+        if not orders:
+            return self.env['account.move']
         
-        if self.advance_payment <= 0:
-            return
-        
-        # Get default accounts
-        receivable_account = self.partner_id.property_account_receivable_id
-        if not receivable_account:
-            raise UserError(_("Please configure a receivable account for customer %s") % self.partner_id.name)
+        # Resolve accounts and journal once per company
+        entry_orders = self.browse()
+        move_vals_list = []
+        for company, company_orders in orders.grouped('company_id').items():
+            company_orders = company_orders.with_company(company)
+            advance_account = company_orders._get_advance_payment_account()
+            journal = company_orders._get_advance_payment_journal()
+            for order in company_orders:
+                receivable_account = order.partner_id.property_account_receivable_id
+                if not receivable_account:
+                    raise UserError(_("Please configure a receivable account for customer %s") % order.partner_id.name)
+                move_vals_list.append(order._prepare_advance_payment_move_vals(receivable_account, advance_account, journal))
+                entry_orders |= order
         
-        # Get or create advance payment account (liability account)
-        advance_account = self._get_advance_payment_account()
+        # Create and post all journal entries together
+        moves = self.env['account.move'].create(move_vals_list)
+        moves.action_post()
         
-        # Get default journal
-        journal = self._get_advance_payment_journal()
+        # Link to sales orders
+        for order, move in zip(entry_orders, moves):
+            order.advance_journal_entry_id = move.id
+            order.advance_payment_state = 'recorded'
         
-        # Prepare journal entry values
-        move_vals = {
+        # Log in chatter
+        entry_orders._message_log_batch(
+            bodies={
+                order.id: Markup(_(
+                    "Advance payment journal entry created: %s<br/>"
+                    "Amount: %s %s<br/>"
+                    "Entry: <a href='/web#id=%s&model=account.move&view_type=form'>%s</a>"
+                ) % (
+                    move.name,
+                    order.advance_payment,
+                    order.currency_id.name,
+                    move.id,
+                    move.name
+                ))
+                for order, move in zip(entry_orders, moves)
+            },
+            subtype_id=self.env['ir.model.data']._xmlid_to_res_id('mail.mt_note'),
+        )
+        return moves
+
+    def _prepare_advance_payment_move_vals(self, receivable_account, advance_account, journal):
+        """Prepare journal entry values for the advance payment"""
+        self.ensure_one()
+        return {
             'move_type': 'entry',
             'journal_id': journal.id,
             'partner_id': self.partner_id.id,
             'date': fields.Date.context_today(self),
             'ref': _('Advance Payment for %s') % self.name,
+            'advance_order_id': self.id,
+            'advance_move_kind': 'advance',
             'line_ids': [
                 # Debit: Customer Receivable
                 (0, 0, {
@@ -88,65 +191,95 @@ class SaleOrder(models.Model):
                 }),
             ],
         }
-        
-        # Create journal entry
-        move = self.env['account.move'].create(move_vals)
-        
-        # Link to sales order
-        self.advance_journal_entry_id = move.id
-        self.advance_payment_state = 'recorded'
-        
-        # Post the journal entry
-        move.action_post()
-        
-        # Log in chatter
-        self.message_post(
-            body=Markup(_(
-                "Advance payment journal entry created: %s<br/>"
-                "Amount: %s %s<br/>"
-                "Entry: <a href='/web#id=%s&model=account.move&view_type=form'>%s</a>"
-            ) % (
-                move.name,
-                self.advance_payment,
-                self.currency_id.name,
-                move.id,
-                move.name
-            )),
-            subtype_xmlid='mail.mt_note'
-        )
 
     def _get_advance_payment_account(self):
-        """Get or create advance payment account (liability account)"""
-        # Try to find existing advance payment account
-        advance_account = self.env['account.account'].search([
-            ('code', '=', '2010'),
-        ], limit=1)
-        
-        if not advance_account:
-            # Create advance payment account if it doesn't exist
-            advance_account = self.env['account.account'].create({
-                'name': 'Advance Payments from Customers',
-                'code': '2010',
-                'account_type': 'liability_current',
-            })
-        
-        return advance_account
+        """Get the advance payment account (liability account) configured on the company"""
+        company = self.company_id[:1] or self.env.company
+        account_id = self.env['res.company']._get_advance_payment_config(company.id)[0]
+        if not account_id:
+            raise UserError(_("Please configure an advance payment account for company %s in the Accounting settings") % company.name)
+        return self.env['account.account'].browse(account_id)
 
     def _get_advance_payment_journal(self):
-        """Get journal for advance payment entries"""
-        # Try to find miscellaneous journal first
-        journal = self.env['account.journal'].search([
-            ('type', '=', 'general'),
-        ], limit=1)
-        
-        if not journal:
-            # Fallback to any available journal
-            journal = self.env['account.journal'].search([], limit=1)
-        
-        if not journal:
-            raise UserError(_("No journal found"))
+        """Get the journal for advance payment entries configured on the company"""
+        company = self.company_id[:1] or self.env.company
+        journal_id = self.env['res.company']._get_advance_payment_config(company.id)[1]
+        if not journal_id:
+            raise UserError(_("Please configure an advance payment journal for company %s in the Accounting settings") % company.name)
+        return self.env['account.journal'].browse(journal_id)
+
+    @api.model
+    def _get_advance_backfill_domain(self):
+        """Confirmed orders with an advance payment but no advance journal entry"""
+        return [
+            ('state', '=', 'sale'),
+            ('advance_payment', '>', 0),
+            ('advance_journal_entry_id', '=', False),
+        ]
+
+    @api.model
+    def _cron_backfill_advance_payment_entries(self, batch_size=BACKFILL_BATCH_SIZE, time_limit=BACKFILL_TIME_LIMIT):
+        """Create the missing advance entries of confirmed orders in committed chunks"""
+        deadline = time.monotonic() + time_limit
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        params = self.env['ir.config_parameter'].sudo()
+        last_id = int(params.get_param(BACKFILL_CURSOR_PARAM, 0))
+        domain = self._get_advance_backfill_domain()
+        done = failed = 0
+        while time.monotonic() < deadline:
+            orders = self.search(domain + [('id', '>', last_id)], order='id', limit=batch_size)
+            if not orders:
+                # Full pass completed, orders that failed are retried on the next run
+                last_id = 0
+                break
+            processed, errors = orders._backfill_advance_payment_entries()
+            done += processed
+            failed += errors
+            last_id = orders[-1].id
+            if auto_commit:
+                self.env.cr.commit()
+            # Keep memory bounded across chunks
+            self.env.invalidate_all()
+        # Processed orders leave the domain; the cursor only skips orders that failed
+        params.set_param(BACKFILL_CURSOR_PARAM, last_id)
+        remaining = self.search_count(domain)
+        _logger.info(
+            "Advance payment backfill: %s entries created, %s failed, %s orders remaining",
+            done, failed, remaining
+        )
+        self.env['ir.cron']._notify_progress(done=done, remaining=remaining)
+
+    def _create_backfilled_advance_entries(self):
+        """Create the advance entries and consume them against the invoices already posted"""
+        self._create_advance_payment_entries()
+        invoices = self.invoice_ids.filtered(lambda move: move.move_type == 'out_invoice' and move.state == 'posted')
+        if invoices:
+            invoices._reconcile_advance_payments()
+
+    def _backfill_advance_payment_entries(self):
+        """Create advance entries for a chunk, isolating orders that fail; returns (processed, failed)"""
+        try:
+            with self.env.cr.savepoint():
+                self._create_backfilled_advance_entries()
+            return len(self), 0
+        except (UserError, ValidationError):
+            self.env.invalidate_all()
         
-        return journal
+        processed = failed = 0
+        for order in self:
+            try:
+                with self.env.cr.savepoint():
+                    order._create_backfilled_advance_entries()
+                processed += 1
+            except (UserError, ValidationError) as error:
+                self.env.invalidate_all()
+                failed += 1
+                _logger.warning("Advance payment backfill failed for order %s: %s", order.name, error)
+        return processed, failed
+
+    def action_run_advance_backfill(self):
+        """Schedule the advance payment backfill to run as soon as possible"""
+        self.env.ref('sale_advance_payment_entries.ir_cron_backfill_advance_payment_entries')._trigger()
 
     def action_view_advance_journal_entry(self):
         """Action to view the advance payment journal entry"""
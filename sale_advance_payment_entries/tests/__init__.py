@@ -0,0 +1 @@
+from . import test_advance_consumption
\ No newline at end of file
@@ -0,0 +1,158 @@
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestAdvanceConsumption(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.company_data['company']
+        cls.company._setup_advance_payment_accounts()
+        cls.product = cls.env['product.product'].create({
+            'name': 'Advance Product',
+            'type': 'service',
+            'invoice_policy': 'order',
+            'lst_price': 1000.0,
+            'taxes_id': [(5, 0, 0)],
+        })
+
+    def _create_order(self, quantity, advance):
+        """Confirmed order of ``quantity`` units at 1000 with an ``advance`` payment entry"""
+        order = self.env['sale.order'].create({
+            'partner_id': self.partner_a.id,
+            'order_line': [(0, 0, {
+                'product_id': self.product.id,
+                'product_uom_qty': quantity,
+                'price_unit': 1000.0,
+                'tax_id': [(5, 0, 0)],
+            })],
+        })
+        order.advance_payment = advance
+        order.action_confirm()
+        return order
+
+    def _create_invoice(self, order, quantity, post=True):
+        """Customer invoice of ``quantity`` units of the order"""
+        invoice = self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner_a.id,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': quantity,
+                'price_unit': 1000.0,
+                'tax_ids': [(5, 0, 0)],
+                'sale_line_ids': [(6, 0, order.order_line.ids)],
+            })],
+        })
+        if post:
+            invoice.action_post()
+        return invoice
+
+    def _get_balance(self):
+        return self.env['sale.advance.balance'].search([
+            ('partner_id', '=', self.partner_a.id),
+            ('company_id', '=', self.company.id),
+        ]).balance
+
+    def test_partial_consumption(self):
+        order = self._create_order(3, 1500.0)
+        
+        invoice = self._create_invoice(order, 1)
+        self.assertEqual(invoice.amount_residual, 0.0)
+        self.assertEqual(order.advance_consumed_amount, 1000.0)
+        self.assertEqual(order.advance_residual, 500.0)
+        
+        invoice = self._create_invoice(order, 2)
+        self.assertEqual(invoice.amount_residual, 1500.0)
+        self.assertEqual(order.advance_consumed_amount, 1500.0)
+        self.assertEqual(order.advance_residual, 0.0)
+        self.assertEqual(self._get_balance(), 0.0)
+
+    def test_several_invoices_posted_together(self):
+        order = self._create_order(2, 1500.0)
+        invoices = self._create_invoice(order, 1, post=False) | self._create_invoice(order, 1, post=False)
+        invoices.action_post()
+        
+        self.assertEqual(invoices.mapped('amount_residual'), [0.0, 500.0])
+        self.assertEqual(order.advance_move_ids.filtered(lambda move: move.advance_move_kind == 'consumption').advance_invoice_id, invoices)
+        self.assertEqual(order.advance_residual, 0.0)
+
+    def test_reset_to_draft_releases_advance(self):
+        order = self._create_order(1, 1000.0)
+        invoice = self._create_invoice(order, 1)
+        self.assertEqual(order.advance_residual, 0.0)
+        
+        invoice.button_draft()
+        self.assertEqual(order.advance_consumed_amount, 0.0)
+        self.assertEqual(order.advance_residual, 1000.0)
+        self.assertEqual(self._get_balance(), 1000.0)
+        
+        invoice.action_post()
+        self.assertEqual(invoice.amount_residual, 0.0)
+        self.assertEqual(order.advance_consumed_amount, 1000.0)
+        self.assertEqual(self._get_balance(), 0.0)
+
+    def test_cancel_and_credit_note_release_advance(self):
+        order = self._create_order(2, 2000.0)
+        cancelled = self._create_invoice(order, 1)
+        cancelled.button_cancel()
+        self.assertEqual(order.advance_residual, 2000.0)
+        
+        refunded = self._create_invoice(order, 1)
+        self.assertEqual(order.advance_residual, 1000.0)
+        refunded._reverse_moves(cancel=True)
+        self.assertEqual(order.advance_residual, 2000.0)
+        self.assertEqual(refunded.amount_residual, 0.0)
+
+    def test_reversed_advance_is_not_consumed(self):
+        order = self._create_order(1, 1000.0)
+        order.advance_journal_entry_id._reverse_moves(cancel=True)
+        self.assertEqual(order.advance_residual, 0.0)
+        
+        invoice = self._create_invoice(order, 1)
+        self.assertEqual(invoice.amount_residual, 1000.0)
+        self.assertEqual(self._get_balance(), 0.0)
+
+    def test_partial_credit_note_keeps_remaining_consumption(self):
+        order = self._create_order(1, 1000.0)
+        invoice = self._create_invoice(order, 1)
+        refund = self.env['account.move'].create({
+            'move_type': 'out_refund',
+            'partner_id': self.partner_a.id,
+            'reversed_entry_id': invoice.id,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1,
+                'price_unit': 100.0,
+                'tax_ids': [(5, 0, 0)],
+            })],
+        })
+        refund.action_post()
+        self.assertEqual(order.advance_consumed_amount, 900.0)
+        self.assertEqual(order.advance_residual, 100.0)
+        self.assertEqual(invoice.amount_residual, 100.0)
+        self.assertEqual(self._get_balance(), 100.0)
+        
+        (invoice | refund).line_ids.filtered(lambda line: line.account_id.account_type == 'asset_receivable').reconcile()
+        self.assertEqual(invoice.amount_residual, 0.0)
+        self.assertEqual(refund.amount_residual, 0.0)
+        
+        refund.button_draft()
+        self.assertEqual(order.advance_consumed_amount, 1000.0)
+        self.assertEqual(order.advance_residual, 0.0)
+        self.assertEqual(invoice.amount_residual, 0.0)
+
+    def test_backfill_consumes_posted_invoices(self):
+        order = self._create_order(2, 0.0)
+        invoice = self._create_invoice(order, 1)
+        order.advance_payment = 1500.0
+        self.assertFalse(order.advance_journal_entry_id)
+        
+        self.env['sale.order']._cron_backfill_advance_payment_entries()
+        self.assertTrue(order.advance_journal_entry_id)
+        self.assertEqual(invoice.amount_residual, 0.0)
+        self.assertEqual(order.advance_consumed_amount, 1000.0)
+        self.assertEqual(order.advance_residual, 500.0)
+        self.assertEqual(self._get_balance(), 500.0)
\ No newline at end of file
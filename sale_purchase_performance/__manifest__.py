@@ -0,0 +1,52 @@
+{
+    'name': 'Sales and Purchase Performance Instrumentation',
+    'version': '18.0.1.0.0',
+    'summary': 'Timing and SQL metrics for the hot paths of the sales and purchase addons',
+    'description': """
+Sales and Purchase Performance Instrumentation
+==============================================
+This module measures the hot paths of the sales and purchase addons in production:
+
+Features:
+- Decorator and context manager recording wall time, SQL query count and SQL time
+- Per-worker in-memory aggregation, periodically flushed to daily statistics
+- Warning log line for every call slower than a configurable threshold
+- Statistics report per instrumented method
+
+Instrumented Methods:
+- Discount rule application on sales orders
+- Profitability report data computation
+- Advance payment journal entry creation
+- Purchase order confirmation and approval notifications
+
+Load Testing:
+- scripts/load_test.py drives sale order creation, confirmation with advances and
+  purchase confirmation/approval from parallel cursors and reports throughput,
+  p50/p99 latency, serialization retries and duplicated lazily-created records
+
+Configuration:
+- System parameter sale_purchase_performance.slow_call_threshold_ms (default 1000),
+  re-read by each worker every 5 minutes
+    """,
+    'category': 'Technical',
+    'author': 'Aurangzaib Bhatti',
+    'website': '',
+    'depends': [
+        'base',
+        'sales_discount_engine',
+        'sales_profitability_report',
+        'sale_advance_payment_entries',
+        'purchase_approval_workflow',
+    ],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_config_parameter_data.xml',
+        'data/ir_cron_data.xml',
+        'views/performance_stat_views.xml',
+    ],
+    'demo': [],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+    'license': 'LGPL-3',
+}
\ No newline at end of file
@@ -0,0 +1,117 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+# Seconds between two flushes of a worker's in-memory statistics
+FLUSH_INTERVAL = 60
+THRESHOLD_PARAM = 'sale_purchase_performance.slow_call_threshold_ms'
+DEFAULT_THRESHOLD_MS = 1000
+# Seconds the slow call threshold is kept before being read again
+THRESHOLD_TTL = 300
+
+# {(dbname, key): [calls, total_ms, max_ms, queries, sql_ms]} aggregated in this worker
+_stats = {}
+_stats_lock = threading.Lock()
+_last_flush = time.monotonic()
+# {dbname: (threshold_ms, expiry)} read from the system parameter
+_thresholds = {}
+
+
+@contextmanager
+def profile_call(env, key):
+    """Record wall time, SQL query count and SQL time of the enclosed block under ``key``"""
+    thread = threading.current_thread()
+    if not hasattr(thread, 'query_count'):
+        # Outside HTTP requests (crons, shell) the cursor does not track SQL time unless asked to
+        thread.query_count = 0
+        thread.query_time = 0.0
+    start_queries = env.cr.sql_log_count
+    start_sql_time = thread.query_time
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        wall_ms = (time.perf_counter() - start) * 1000
+        queries = env.cr.sql_log_count - start_queries
+        sql_ms = (thread.query_time - start_sql_time) * 1000
+        _record(env, key, wall_ms, queries, sql_ms, failed)
+
+
+def instrumented(key):
+    """Method decorator profiling every call with :func:`profile_call`"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with profile_call(self.env, key):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(env, key, wall_ms, queries, sql_ms, failed=False):
+    """Aggregate a measured call; never runs SQL on ``env.cr``, which may be in a failed transaction"""
+    global _last_flush
+    dbname = env.cr.dbname
+    # Tests count queries: no flush transaction and no threshold lookup may interfere
+    testing = getattr(threading.current_thread(), 'testing', False)
+    with _stats_lock:
+        stat = _stats.setdefault((dbname, key), [0, 0.0, 0.0, 0, 0.0])
+        stat[0] += 1
+        stat[1] += wall_ms
+        stat[2] = max(stat[2], wall_ms)
+        stat[3] += queries
+        stat[4] += sql_ms
+        flush_due = not testing and time.monotonic() - _last_flush >= FLUSH_INTERVAL
+        if flush_due:
+            _last_flush = time.monotonic()
+    
+    threshold = _get_threshold(env.registry) if not testing else 0
+    if threshold and wall_ms > threshold:
+        _logger.warning(
+            "Slow call %s%s: %.1f ms, %s queries (%.1f ms SQL), threshold %.0f ms",
+            key, " (failed)" if failed else "", wall_ms, queries, sql_ms, threshold
+        )
+    if flush_due:
+        # Flush once the measured transaction has committed, never while it is still running
+        env.cr.postcommit.add(functools.partial(flush_stats, env.registry))
+
+
+def _get_threshold(registry):
+    """Slow call threshold in milliseconds, read through a separate cursor at most every THRESHOLD_TTL seconds"""
+    threshold, expiry = _thresholds.get(registry.db_name, (DEFAULT_THRESHOLD_MS, 0.0))
+    if time.monotonic() < expiry:
+        return threshold
+    try:
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            threshold = float(env['ir.config_parameter'].get_param(THRESHOLD_PARAM, DEFAULT_THRESHOLD_MS))
+    except Exception:
+        _logger.warning("Could not read the slow call threshold", exc_info=True)
+    _thresholds[registry.db_name] = (threshold, time.monotonic() + THRESHOLD_TTL)
+    return threshold
+
+
+def flush_stats(registry):
+    """Write this worker's statistics for the registry's database and reset them"""
+    with _stats_lock:
+        keys = [stat_key for stat_key in _stats if stat_key[0] == registry.db_name]
+        rows = [(key, *_stats.pop((dbname, key))) for dbname, key in keys]
+    if not rows:
+        return
+    try:
+        # Separate cursor: statistics must not depend on the outcome of the measured transaction
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env['performance.stat']._add_stats(rows)
+    except Exception:
+        _logger.warning("Could not flush performance statistics", exc_info=True)
@@ -0,0 +1,4 @@
+from . import performance_stat
+from . import sale_order
+from . import purchase_order
+from . import sales_profitability_wizard
\ No newline at end of file
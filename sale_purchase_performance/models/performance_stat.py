@@ -0,0 +1,69 @@
+from odoo import models, fields, api
+
+from ..instrumentation import flush_stats
+
+
+class PerformanceStat(models.Model):
+    _name = 'performance.stat'
+    _description = 'Hot Path Performance Statistics'
+    _order = 'date desc, total_time_ms desc'
+    _rec_name = 'key'
+
+    key = fields.Char(string='Method', required=True, readonly=True, index=True)
+    date = fields.Date(string='Date', required=True, readonly=True, index=True)
+    
+    call_count = fields.Integer(string='Calls', readonly=True)
+    total_time_ms = fields.Float(string='Total Time (ms)', readonly=True)
+    max_time_ms = fields.Float(string='Max Time (ms)', readonly=True, aggregator='max')
+    query_count = fields.Integer(string='SQL Queries', readonly=True)
+    query_time_ms = fields.Float(string='SQL Time (ms)', readonly=True)
+    
+    avg_time_ms = fields.Float(string='Avg Time (ms)', compute='_compute_averages')
+    avg_query_count = fields.Float(string='Avg Queries', compute='_compute_averages')
+
+    _sql_constraints = [
+        ('key_date_uniq', 'unique(key, date)', 'There can only be one statistics row per method and day.'),
+    ]
+
+    @api.depends('call_count', 'total_time_ms', 'query_count')
+    def _compute_averages(self):
+        for stat in self:
+            stat.avg_time_ms = stat.total_time_ms / stat.call_count if stat.call_count else 0.0
+            stat.avg_query_count = stat.query_count / stat.call_count if stat.call_count else 0.0
+
+    @api.model
+    def _add_stats(self, rows):
+        """Add (key, calls, total_ms, max_ms, queries, sql_ms) rows to today's statistics in one upsert"""
+        self.env.cr.execute("""
+            INSERT INTO performance_stat
+                (key, date, call_count, total_time_ms, max_time_ms, query_count, query_time_ms,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.key, %(date)s, v.calls, v.total_ms, v.max_ms, v.queries, v.sql_ms,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(keys)s::varchar[], %(calls)s::int[], %(total_ms)s::float8[],
+                          %(max_ms)s::float8[], %(queries)s::int[], %(sql_ms)s::float8[])
+                AS v(key, calls, total_ms, max_ms, queries, sql_ms)
+            ON CONFLICT (key, date) DO UPDATE SET
+                call_count = performance_stat.call_count + EXCLUDED.call_count,
+                total_time_ms = performance_stat.total_time_ms + EXCLUDED.total_time_ms,
+                max_time_ms = GREATEST(performance_stat.max_time_ms, EXCLUDED.max_time_ms),
+                query_count = performance_stat.query_count + EXCLUDED.query_count,
+                query_time_ms = performance_stat.query_time_ms + EXCLUDED.query_time_ms,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, {
+            'date': fields.Date.context_today(self),
+            'uid': self.env.uid,
+            'keys': [row[0] for row in rows],
+            'calls': [row[1] for row in rows],
+            'total_ms': [row[2] for row in rows],
+            'max_ms': [row[3] for row in rows],
+            'queries': [row[4] for row in rows],
+            'sql_ms': [row[5] for row in rows],
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _cron_flush_stats(self):
+        """Flush the statistics collected by the cron worker"""
+        flush_stats(self.env.registry)
@@ -0,0 +1,15 @@
+from odoo import models
+
+from ..instrumentation import instrumented
+
+
+class PurchaseOrder(models.Model):
+    _inherit = 'purchase.order'
+
+    @instrumented('purchase.order.button_confirm')
+    def button_confirm(self):
+        return super().button_confirm()
+
+    @instrumented('purchase.order._send_approval_notification')
+    def _send_approval_notification(self, notification_type):
+        return super()._send_approval_notification(notification_type)
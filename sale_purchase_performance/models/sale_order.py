@@ -0,0 +1,15 @@
+from odoo import models
+
+from ..instrumentation import instrumented
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    @instrumented('sale.order._apply_discount_rules')
+    def _apply_discount_rules(self):
+        return super()._apply_discount_rules()
+
+    @instrumented('sale.order._create_advance_payment_entries')
+    def _create_advance_payment_entries(self):
+        return super()._create_advance_payment_entries()
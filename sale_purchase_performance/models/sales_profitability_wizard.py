@@ -0,0 +1,11 @@
+from odoo import models
+
+from ..instrumentation import instrumented
+
+
+class SalesProfitabilityWizard(models.TransientModel):
+    _inherit = 'sales.profitability.wizard'
+
+    @instrumented('sales.profitability.wizard._get_report_data')
+    def _get_report_data(self):
+        return super()._get_report_data()
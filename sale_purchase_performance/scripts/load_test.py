@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Concurrent load test for the sales and purchase flows of these addons.
+
+Drives N worker threads, each committing its own transactions against a local
+PostgreSQL database through the Odoo registry, and reports throughput, p50/p99
+latency, serialization retries and duplicated lazily-created records.
+
+Usage:
+    python3 load_test.py -c /etc/odoo/odoo.conf -d mydb --workers 8 --iterations 25
+    python3 load_test.py -c /etc/odoo/odoo.conf -d mydb --scenario purchase_approve --company-id 3
+
+Run it against a disposable database: every iteration commits new orders.
+"""
+import argparse
+import random
+import threading
+import time
+import traceback
+
+import psycopg2
+from psycopg2 import errorcodes
+
+import odoo
+from odoo import api, SUPERUSER_ID
+from odoo.modules.registry import Registry
+
+MAX_RETRIES = 5
+CONCURRENCY_ERRORS = (
+    errorcodes.SERIALIZATION_FAILURE,
+    errorcodes.DEADLOCK_DETECTED,
+    errorcodes.LOCK_NOT_AVAILABLE,
+)
+
+
+def scenario_sale_create(env, fixtures):
+    """Quotation creation, which applies discount rules and resolves the discount product"""
+    return env['sale.order'].create(_prepare_sale_order_vals(env, fixtures))
+
+
+def scenario_sale_confirm_advance(env, fixtures):
+    """Quotation confirmation with an advance payment, which posts the advance entry"""
+    order = env['sale.order'].create(_prepare_sale_order_vals(env, fixtures))
+    order.advance_payment = round(order.amount_total * 0.3, 2)
+    order.action_confirm()
+    return order
+
+
+def scenario_purchase_approve(env, fixtures):
+    """Purchase order confirmation followed by the approvals it requires"""
+    order = env['purchase.order'].create({
+        'partner_id': fixtures['vendor_id'],
+        'company_id': fixtures['company_id'],
+        'order_line': [(0, 0, {
+            'product_id': fixtures['product_id'],
+            'product_qty': 1,
+            'price_unit': random.choice([1000.0, 10000.0, 50000.0]),
+        })],
+    })
+    order.button_confirm()
+    if order.state == 'to_approve' and order.approval_level_required == 'level1':
+        order.action_approve_level1()
+    elif order.state == 'to_approve':
+        order.action_approve_level2()
+    return order
+
+
+SCENARIOS = {
+    'sale_create': scenario_sale_create,
+    'sale_confirm_advance': scenario_sale_confirm_advance,
+    'purchase_approve': scenario_purchase_approve,
+}
+
+
+def _prepare_sale_order_vals(env, fixtures):
+    return {
+        'partner_id': fixtures['customer_id'],
+        'company_id': fixtures['company_id'],
+        'order_line': [(0, 0, {
+            'product_id': fixtures['product_id'],
+            'product_uom_qty': random.randint(1, 20),
+            'price_unit': random.choice([100.0, 1000.0, 5000.0]),
+        }) for _line in range(random.randint(1, 5))],
+    }
+
+
+def setup_fixtures(registry, company_id=None):
+    """Create the shared partners and product and make the admin an approver at both levels"""
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        company = env['res.company'].browse(company_id) if company_id else env.ref('base.main_company')
+        admin = env.ref('base.user_admin')
+        admin.write({
+            'company_ids': [(4, company.id)],
+            'groups_id': [
+                (4, env.ref('purchase_approval_workflow.group_purchase_level1_approver').id),
+                (4, env.ref('purchase_approval_workflow.group_purchase_level2_approver').id),
+            ],
+        })
+        customer = env['res.partner'].create({'name': 'Load Test Customer', 'is_company': True, 'customer_rank': 1})
+        vendor = env['res.partner'].create({'name': 'Load Test Vendor', 'is_company': True, 'supplier_rank': 1})
+        product = env['product.product'].create({
+            'name': 'Load Test Product',
+            'type': 'consu',
+            'list_price': 100.0,
+            'standard_price': 60.0,
+        })
+        return {
+            'uid': admin.id,
+            'company_id': company.id,
+            'customer_id': customer.id,
+            'vendor_id': vendor.id,
+            'product_id': product.id,
+        }
+
+
+def run_worker(registry, scenario, fixtures, iterations, results):
+    """Run a scenario ``iterations`` times, one committed transaction each, retrying concurrency errors"""
+    for _iteration in range(iterations):
+        # Latency covers failed attempts and backoff, as a client retrying the request would see it
+        start = time.perf_counter()
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with registry.cursor() as cr:
+                    env = api.Environment(cr, fixtures['uid'], {'allowed_company_ids': [fixtures['company_id']]})
+                    scenario(env, fixtures)
+                results['latencies'].append(time.perf_counter() - start)
+                break
+            except psycopg2.OperationalError as error:
+                if error.pgcode not in CONCURRENCY_ERRORS or attempt == MAX_RETRIES:
+                    _record_failure(results)
+                    break
+                results['retries'] += 1
+                time.sleep(random.uniform(0.0, 0.1 * 2 ** attempt))
+            except Exception:
+                _record_failure(results)
+                break
+
+
+def _record_failure(results):
+    """Count a failed iteration, keeping the traceback of the first one"""
+    results['failures'] += 1
+    if not results['error']:
+        results['error'] = traceback.format_exc()
+
+
+def find_duplicates(registry, company_id):
+    """Count records the addons create lazily that exist more than once"""
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        company = env['res.company'].browse(company_id)
+        Account = env['account.account'].with_company(company)
+        return {
+            'purchase.approval.config': env['purchase.approval.config'].search_count([
+                ('company_id', '=', company_id), ('active', '=', True),
+            ]),
+            'discount product': env['product.product'].search_count([
+                ('default_code', '=', 'DISCOUNT'), ('company_id', 'in', [company_id, False]),
+            ]),
+            'advance account 2010': Account.search_count([
+                *Account._check_company_domain(company), ('code', '=', '2010'),
+            ]),
+        }
+
+
+def percentile(values, ratio):
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(ratio * len(values)) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-c', '--config', required=True, help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True, help="Database to load")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel cursors")
+    parser.add_argument('--iterations', type=int, default=20, help="Iterations per worker and scenario")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS) + ['all'], default='all')
+    parser.add_argument('--company-id', type=int, help="Company to run in (default: main company)")
+    args = parser.parse_args()
+
+    odoo.tools.config.parse_config(['-c', args.config, '-d', args.database])
+    registry = Registry(args.database)
+    fixtures = setup_fixtures(registry, args.company_id)
+    scenarios = sorted(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+
+    for name in scenarios:
+        per_worker = [{'latencies': [], 'retries': 0, 'failures': 0, 'error': None} for _worker in range(args.workers)]
+        threads = [
+            threading.Thread(target=run_worker, args=(registry, SCENARIOS[name], fixtures, args.iterations, worker_results))
+            for worker_results in per_worker
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for worker_results in per_worker for latency in worker_results['latencies']]
+        retries = sum(worker_results['retries'] for worker_results in per_worker)
+        failures = sum(worker_results['failures'] for worker_results in per_worker)
+        print(f"{name}: {len(latencies)} ok, {failures} failed, {retries} serialization retries")
+        print(f"  throughput {len(latencies) / elapsed:.1f}/s, "
+              f"p50 {percentile(latencies, 0.50) * 1000:.0f} ms, p99 {percentile(latencies, 0.99) * 1000:.0f} ms")
+        errors = [worker_results['error'] for worker_results in per_worker if worker_results['error']]
+        if errors:
+            print(f"  first failure:\n{errors[0]}")
+
+    for record, count in find_duplicates(registry, fixtures['company_id']).items():
+        status = 'DUPLICATED' if count > 1 else 'ok'
+        print(f"{record}: {count} ({status})")
+
+
+if __name__ == '__main__':
+    main()
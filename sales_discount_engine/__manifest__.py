@@ -12,19 +12,29 @@ This module provides a flexible discount rules engine that allows you to:
 
 Features:
 - Create discount rules with min/max amount criteria
-- Automatic discount calculation on sales orders
+- Order-wide, product and product category scoped rules
+- Exclusive rules competing per line and stackable rules combining on top
+- Automatic discount calculation on sales orders, all rules scored against all lines at once
+- Per-rule evaluation, match and win counters and per-company evaluation latency, periodically
+  flushed to daily statistics
+- Never Won filter on discount rules to find rules without wins over the last 30 days
 - User-friendly interface for discount management
     """,
     'category': 'Sales',
     'author': 'Aurangzaib Bhatti',
     'website': '',
     'depends': ['base', 'sale','sale_management'],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
         'security/ir.model.access.csv',
         'views/customer_group_views.xml',
         'views/sale_discount_rule_views.xml',
+        'views/sale_discount_rule_stat_views.xml',
         'views/sale_order_views.xml',
         'views/menu.xml',
+        'data/ir_cron_data.xml',
     ],
     'demo': [],
     'installable': True,
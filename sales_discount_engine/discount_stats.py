@@ -0,0 +1,63 @@
+import functools
+import logging
+import threading
+import time
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+# Seconds between two flushes of a worker's in-memory rule counters
+FLUSH_INTERVAL = 60
+
+# {(dbname, rule_id): [evaluations, matches, wins, discount_amount]} aggregated in this worker
+_stats = {}
+# {(dbname, company_id): [evaluations, eval_ms]}: latency is measured per evaluation, not per rule
+_evaluations = {}
+_stats_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_evaluation(env, company_id, rule_ids, matched, won, amounts, eval_ms):
+    """Count one evaluation taking ``eval_ms`` and the match/win flags and discounts of its candidate rules"""
+    global _last_flush
+    dbname = env.cr.dbname
+    # Tests count queries: no flush transaction may interfere
+    testing = getattr(threading.current_thread(), 'testing', False)
+    with _stats_lock:
+        evaluation = _evaluations.setdefault((dbname, company_id), [0, 0.0])
+        evaluation[0] += 1
+        evaluation[1] += eval_ms
+        for rule_id, is_match, is_win, amount in zip(rule_ids, matched, won, amounts):
+            stat = _stats.setdefault((dbname, rule_id), [0, 0, 0, 0.0])
+            stat[0] += 1
+            stat[1] += int(is_match)
+            stat[2] += int(is_win)
+            stat[3] += float(amount)
+        flush_due = not testing and time.monotonic() - _last_flush >= FLUSH_INTERVAL
+        if flush_due:
+            _last_flush = time.monotonic()
+    if flush_due:
+        # Flush once the order transaction has committed, never while it is still running
+        env.cr.postcommit.add(functools.partial(flush_stats, env.registry))
+
+
+def flush_stats(registry):
+    """Write this worker's rule and evaluation counters for the registry's database and reset them"""
+    with _stats_lock:
+        keys = [stat_key for stat_key in _stats if stat_key[0] == registry.db_name]
+        rows = [(rule_id, *_stats.pop((dbname, rule_id))) for dbname, rule_id in keys]
+        keys = [evaluation_key for evaluation_key in _evaluations if evaluation_key[0] == registry.db_name]
+        evaluation_rows = [(company_id, *_evaluations.pop((dbname, company_id))) for dbname, company_id in keys]
+    if not rows and not evaluation_rows:
+        return
+    try:
+        # Separate cursor: counters must not depend on the outcome of the order transaction
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            if rows:
+                env['sale.discount.rule.stat']._add_stats(rows)
+            if evaluation_rows:
+                env['sale.discount.evaluation.stat']._add_stats(evaluation_rows)
+    except Exception:
+        _logger.warning("Could not flush discount rule statistics", exc_info=True)
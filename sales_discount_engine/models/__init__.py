@@ -1,2 +1,4 @@
 from . import sale_discount_rule
+from . import sale_discount_rule_stat
+from . import sale_discount_evaluation_stat
 from . import sale_order
\ No newline at end of file
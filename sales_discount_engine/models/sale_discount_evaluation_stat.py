@@ -0,0 +1,52 @@
+from odoo import models, fields, api
+
+
+class SaleDiscountEvaluationStat(models.Model):
+    _name = 'sale.discount.evaluation.stat'
+    _description = 'Discount Evaluation Latency Statistics'
+    _order = 'date desc, company_id'
+    _rec_name = 'date'
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True,
+                                 index=True, ondelete='cascade')
+    date = fields.Date(string='Date', required=True, readonly=True, index=True)
+    evaluation_count = fields.Integer(string='Evaluations', readonly=True,
+                                      help="Orders whose discount rules were evaluated")
+    eval_time_ms = fields.Float(string='Evaluation Time (ms)', readonly=True,
+                                help="Total time spent evaluating the discount rules of these orders")
+    avg_eval_time_ms = fields.Float(string='Avg Evaluation Time (ms)', compute='_compute_avg_eval_time_ms')
+
+    _sql_constraints = [
+        ('company_date_uniq', 'unique(company_id, date)', 'There can only be one evaluation statistics row per company and day.'),
+    ]
+
+    @api.depends('evaluation_count', 'eval_time_ms')
+    def _compute_avg_eval_time_ms(self):
+        for stat in self:
+            stat.avg_eval_time_ms = stat.eval_time_ms / stat.evaluation_count if stat.evaluation_count else 0.0
+
+    @api.model
+    def _add_stats(self, rows):
+        """Add (company_id, evaluations, eval_ms) rows to today's statistics in one upsert"""
+        self.env.cr.execute("""
+            INSERT INTO sale_discount_evaluation_stat
+                (company_id, date, evaluation_count, eval_time_ms,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.company_id, %(date)s, v.evaluations, v.eval_ms,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(company_ids)s::int[], %(evaluations)s::int[], %(eval_ms)s::float8[])
+                AS v(company_id, evaluations, eval_ms)
+              JOIN res_company company ON company.id = v.company_id
+            ON CONFLICT (company_id, date) DO UPDATE SET
+                evaluation_count = sale_discount_evaluation_stat.evaluation_count + EXCLUDED.evaluation_count,
+                eval_time_ms = sale_discount_evaluation_stat.eval_time_ms + EXCLUDED.eval_time_ms,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, {
+            'date': fields.Date.context_today(self),
+            'uid': self.env.uid,
+            'company_ids': [row[0] for row in rows],
+            'evaluations': [row[1] for row in rows],
+            'eval_ms': [row[2] for row in rows],
+        })
+        self.invalidate_model()
\ No newline at end of file
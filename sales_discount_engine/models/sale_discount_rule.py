@@ -1,5 +1,16 @@
-from odoo import models, fields, api
-from datetime import date
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from datetime import date, timedelta
+import time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..discount_stats import record_evaluation
+
+# Days of statistics summarized on the rule form
+STATS_PERIOD_DAYS = 30
 
 
 class CustomerGroup(models.Model):
@@ -61,6 +72,38 @@ class SaleDiscountRule(models.Model):
         required=True
     )
     
+    scope = fields.Selection([
+        ('order', 'Whole Order'),
+        ('product', 'Specific Products'),
+        ('category', 'Product Categories'),
+    ], string='Applies To', default='order', required=True,
+        help="Order lines the discount percentage is applied to")
+    
+    product_ids = fields.Many2many(
+        'product.product',
+        string='Products',
+        help="Products discounted by this rule"
+    )
+    
+    categ_ids = fields.Many2many(
+        'product.category',
+        string='Product Categories',
+        help="Product categories (including their subcategories) discounted by this rule"
+    )
+    
+    stackable = fields.Boolean(
+        string='Stackable',
+        help="Stackable rules apply on top of the best exclusive rule of each line and of each other. "
+             "Exclusive rules compete: only the highest one applies to a line."
+    )
+    
+    stat_ids = fields.One2many('sale.discount.rule.stat', 'rule_id', string='Statistics')
+    stat_evaluation_count = fields.Integer(string='Evaluations', compute='_compute_stats')
+    stat_match_count = fields.Integer(string='Matches', compute='_compute_stats')
+    stat_win_count = fields.Integer(string='Wins', compute='_compute_stats', search='_search_stat_win_count')
+    stat_hit_rate = fields.Float(string='Hit Rate (%)', compute='_compute_stats')
+    stat_discount_amount = fields.Float(string='Discount Granted', compute='_compute_stats')
+    
     @api.constrains('min_amount', 'max_amount')
     def _check_amounts(self):
         for rule in self:
@@ -81,6 +124,56 @@ class SaleDiscountRule(models.Model):
             if rule.valid_to and rule.valid_from > rule.valid_to:
                 raise ValueError("Valid from date must be before valid to date")
     
+    def _compute_stats(self):
+        date_from = fields.Date.context_today(self) - timedelta(days=STATS_PERIOD_DAYS)
+        stats = {
+            rule.id: (evaluations, matches, wins, amount)
+            for rule, evaluations, matches, wins, amount in self.env['sale.discount.rule.stat']._read_group(
+                [('rule_id', 'in', self.ids), ('date', '>=', date_from)],
+                ['rule_id'],
+                ['evaluation_count:sum', 'match_count:sum', 'win_count:sum', 'discount_amount:sum'],
+            )
+        }
+        for rule in self:
+            evaluations, matches, wins, amount = stats.get(rule.id, (0, 0, 0, 0.0))
+            rule.stat_evaluation_count = evaluations
+            rule.stat_match_count = matches
+            rule.stat_win_count = wins
+            rule.stat_hit_rate = 100.0 * wins / evaluations if evaluations else 0.0
+            rule.stat_discount_amount = amount
+    
+    def _search_stat_win_count(self, operator, value):
+        """Search rules by their wins over the statistics period, rules without statistics having none"""
+        comparators = {
+            '=': lambda wins: wins == value,
+            '!=': lambda wins: wins != value,
+            '<': lambda wins: wins < value,
+            '<=': lambda wins: wins <= value,
+            '>': lambda wins: wins > value,
+            '>=': lambda wins: wins >= value,
+        }
+        if operator not in comparators:
+            raise UserError(_("Unsupported operator %s for the number of wins") % operator)
+        date_from = fields.Date.context_today(self) - timedelta(days=STATS_PERIOD_DAYS)
+        wins_by_rule = {
+            rule.id: wins
+            for rule, wins in self.env['sale.discount.rule.stat']._read_group(
+                [('date', '>=', date_from)], ['rule_id'], ['win_count:sum'],
+            )
+        }
+        matching_ids = [rule_id for rule_id, wins in wins_by_rule.items() if comparators[operator](wins)]
+        if comparators[operator](0):
+            return ['|', ('id', 'in', matching_ids), ('id', 'not in', list(wins_by_rule))]
+        return [('id', 'in', matching_ids)]
+    
+    def action_view_stats(self):
+        """Open the daily statistics of the rule"""
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id('sales_discount_engine.action_sale_discount_rule_stat')
+        action['domain'] = [('rule_id', '=', self.id)]
+        action['context'] = {'default_rule_id': self.id}
+        return action
+    
     def is_applicable(self, amount, customer_group=None, order_date=None):
         self.ensure_one()
         if not self.active:
@@ -127,4 +220,87 @@ class SaleDiscountRule(models.Model):
         
         # Return the rule with the highest discount amount
         best_rule = max(applicable_rules, key=lambda x: x[1])
-        return best_rule[0]
\ No newline at end of file
+        return best_rule[0]
+
+    @api.model
+    def _get_candidate_rules(self, amount, customer_group=None, order_date=None, company=None):
+        """Rules whose amount range, validity and customer group match the order"""
+        check_date = order_date or fields.Date.context_today(self)
+        domain = [
+            ('active', '=', True),
+            ('min_amount', '<=', amount),
+            '|', '|', ('max_amount', '=', False), ('max_amount', '=', 0), ('max_amount', '>=', amount),
+            ('valid_from', '<=', check_date),
+            '|', ('valid_to', '=', False), ('valid_to', '>=', check_date),
+        ]
+        if customer_group:
+            domain += ['|', ('customer_group', '=', False), ('customer_group', '=', customer_group.id)]
+        if company:
+            domain.append(('company_id', '=', company.id))
+        return self.search(domain)
+
+    @api.model
+    def _evaluate_lines(self, lines_data, amount, customer_group=None, order_date=None, company=None):
+        """Score all candidate rules against all lines in one array-based pass
+
+        ``lines_data`` is a list of ``(product_id, categ_id, subtotal)``. Returns the candidate
+        rules and a (rules x lines) array of the discount amount each rule grants each line:
+        the best exclusive rule of every line applies first, then stackable rules in sequence
+        order on the remaining amount. Evaluations, matches and wins of every candidate rule,
+        and the latency of the evaluation, are counted in the worker's statistics.
+        """
+        if np is None:
+            raise UserError(_("The numpy Python library is not installed. Please install it using: pip install numpy"))
+        
+        start = time.perf_counter()
+        rules = self._get_candidate_rules(amount, customer_group, order_date, company)
+        applicable, discounts = self._score_lines(rules, lines_data)
+        record_evaluation(
+            self.env, (company or self.env.company).id, rules.ids,
+            applicable.any(axis=1), discounts.any(axis=1), discounts.sum(axis=1),
+            (time.perf_counter() - start) * 1000,
+        )
+        return rules, discounts
+
+    def _score_lines(self, rules, lines_data):
+        """Return the (rules x lines) applicability and discount arrays of ``rules``"""
+        if not rules or not lines_data:
+            return np.zeros((len(rules), len(lines_data)), dtype=bool), np.zeros((len(rules), len(lines_data)))
+        
+        product_ids = np.array([line[0] for line in lines_data])
+        categ_ids = np.array([line[1] for line in lines_data])
+        subtotals = np.array([line[2] for line in lines_data], dtype=float)
+        
+        # Applicability matrix: which rule applies to which line
+        applicable = np.ones((len(rules), len(lines_data)), dtype=bool)
+        categ_ancestors = {
+            categ.id: {int(parent_id) for parent_id in categ.parent_path.split('/') if parent_id}
+            for categ in self.env['product.category'].browse(set(categ_ids.tolist()) - {False})
+        }
+        for index, rule in enumerate(rules):
+            if rule.scope == 'product':
+                applicable[index] = np.isin(product_ids, rule.product_ids.ids)
+            elif rule.scope == 'category':
+                rule_categ_ids = set(rule.categ_ids.ids)
+                matching = [categ_id for categ_id, ancestors in categ_ancestors.items() if ancestors & rule_categ_ids]
+                applicable[index] = np.isin(categ_ids, matching)
+        
+        rates = applicable * (np.array(rules.mapped('discount_percent')) / 100)[:, None]
+        stackable = np.array(rules.mapped('stackable'))[:, None]
+        line_index = np.arange(len(lines_data))
+        
+        # Exclusive rules: only the best one applies to each line
+        exclusive_rates = np.where(stackable, 0.0, rates)
+        best_rule = exclusive_rates.argmax(axis=0)
+        best_rate = exclusive_rates[best_rule, line_index]
+        discounts = np.zeros_like(rates)
+        discounts[best_rule, line_index] = subtotals * best_rate
+        
+        # Stackable rules compound on what remains after the exclusive discount
+        stack_rates = np.where(stackable, rates, 0.0)
+        remaining_before = np.vstack([
+            np.ones((1, len(lines_data))),
+            np.cumprod(1 - stack_rates, axis=0)[:-1],
+        ])
+        discounts += (subtotals * (1 - best_rate)) * remaining_before * stack_rates
+        return applicable, discounts
\ No newline at end of file
@@ -0,0 +1,71 @@
+from odoo import models, fields, api
+
+from ..discount_stats import flush_stats
+
+
+class SaleDiscountRuleStat(models.Model):
+    _name = 'sale.discount.rule.stat'
+    _description = 'Discount Rule Hit Statistics'
+    _order = 'date desc, rule_id'
+    _rec_name = 'rule_id'
+
+    rule_id = fields.Many2one('sale.discount.rule', string='Discount Rule', required=True, readonly=True,
+                              index=True, ondelete='cascade')
+    company_id = fields.Many2one(related='rule_id.company_id', string='Company')
+    date = fields.Date(string='Date', required=True, readonly=True, index=True)
+
+    evaluation_count = fields.Integer(string='Evaluations', readonly=True,
+                                      help="Orders for which the rule passed the amount, date and customer group filters")
+    match_count = fields.Integer(string='Matches', readonly=True,
+                                 help="Evaluations in which the rule applied to at least one order line")
+    win_count = fields.Integer(string='Wins', readonly=True,
+                               help="Evaluations in which the rule actually granted a discount")
+    discount_amount = fields.Float(string='Discount Granted', readonly=True)
+
+    hit_rate = fields.Float(string='Hit Rate (%)', compute='_compute_rates')
+
+    _sql_constraints = [
+        ('rule_date_uniq', 'unique(rule_id, date)', 'There can only be one statistics row per rule and day.'),
+    ]
+
+    @api.depends('evaluation_count', 'win_count')
+    def _compute_rates(self):
+        for stat in self:
+            stat.hit_rate = 100.0 * stat.win_count / stat.evaluation_count if stat.evaluation_count else 0.0
+
+    @api.model
+    def _add_stats(self, rows):
+        """Add (rule_id, evaluations, matches, wins, amount) rows to today's statistics in one upsert"""
+        # The join skips rules deleted since the counters were collected
+        self.env.cr.execute("""
+            INSERT INTO sale_discount_rule_stat
+                (rule_id, date, evaluation_count, match_count, win_count, discount_amount,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.rule_id, %(date)s, v.evaluations, v.matches, v.wins, v.amount,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(rule_ids)s::int[], %(evaluations)s::int[], %(matches)s::int[],
+                          %(wins)s::int[], %(amounts)s::float8[])
+                AS v(rule_id, evaluations, matches, wins, amount)
+              JOIN sale_discount_rule rule ON rule.id = v.rule_id
+            ON CONFLICT (rule_id, date) DO UPDATE SET
+                evaluation_count = sale_discount_rule_stat.evaluation_count + EXCLUDED.evaluation_count,
+                match_count = sale_discount_rule_stat.match_count + EXCLUDED.match_count,
+                win_count = sale_discount_rule_stat.win_count + EXCLUDED.win_count,
+                discount_amount = sale_discount_rule_stat.discount_amount + EXCLUDED.discount_amount,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, {
+            'date': fields.Date.context_today(self),
+            'uid': self.env.uid,
+            'rule_ids': [row[0] for row in rows],
+            'evaluations': [row[1] for row in rows],
+            'matches': [row[2] for row in rows],
+            'wins': [row[3] for row in rows],
+            'amounts': [row[4] for row in rows],
+        })
+        self.invalidate_model()
+
+    @api.model
+    def _cron_flush_stats(self):
+        """Flush the rule counters collected by the cron worker"""
+        flush_stats(self.env.registry)
\ No newline at end of file
@@ -37,7 +37,7 @@ class SaleOrder(models.Model):
             order._apply_discount_rules()
     
     def _apply_discount_rules(self):
-        """Apply the best matching discount rule to the order"""
+        """Apply the best combination of matching discount rules to the order"""
         self.ensure_one()
         
         if self.state not in ['draft', 'sent']:
@@ -57,36 +57,40 @@ class SaleOrder(models.Model):
         if order_total <= 0:
             return
         
-        # Find the best discount rule (no customer group filtering for now)
-        best_rule = self.env['sale.discount.rule'].find_applicable_rules(
+        # Score every candidate rule against every line in one pass. Negative lines are kept so that
+        # order-wide rules discount the net order total
+        lines = self.order_line.filtered(lambda line: not line.is_discount_line)
+        rules, discounts = self.env['sale.discount.rule']._evaluate_lines(
+            [(line.product_id.id, line.product_id.categ_id.id, line.price_subtotal) for line in lines],
             amount=order_total,
             customer_group=None,  # Can be extended later if needed
-            order_date=self.date_order.date() if self.date_order else fields.Date.context_today(self)
+            order_date=self.date_order.date() if self.date_order else fields.Date.context_today(self),
+            company=self.company_id,
         )
         
-        if not best_rule:
+        rule_amounts = [
+            (rule, self.currency_id.round(float(amount)))
+            for rule, amount in zip(rules, discounts.sum(axis=1))
+        ]
+        rule_amounts = [(rule, amount) for rule, amount in rule_amounts if amount > 0]
+        if not rule_amounts:
             return
         
-        # Calculate discount amount
-        discount_amount = best_rule.calculate_discount(order_total)
-        
-        if discount_amount > 0:
-            # Create discount line
-            discount_product = self._get_discount_product()
-            if discount_product:
-                discount_line_vals = {
-                    'order_id': self.id,
-                    'product_id': discount_product.id,
-                    'name': f'Discount: {best_rule.name}',
-                    'product_uom_qty': 1,
-                    'price_unit': -discount_amount,
-                    'is_discount_line': True,
-                }
-                self.env['sale.order.line'].create(discount_line_vals)
-                
-                # Update tracking fields
-                self.applied_discount_rule_id = best_rule.id
-                self.applied_discount_amount = discount_amount
+        # Create one discount line per contributing rule
+        discount_product = self._get_discount_product()
+        if discount_product:
+            self.env['sale.order.line'].create([{
+                'order_id': self.id,
+                'product_id': discount_product.id,
+                'name': f'Discount: {rule.name}',
+                'product_uom_qty': 1,
+                'price_unit': -amount,
+                'is_discount_line': True,
+            } for rule, amount in rule_amounts])
+            
+            # Update tracking fields
+            self.applied_discount_rule_id = max(rule_amounts, key=lambda rule_amount: rule_amount[1])[0].id
+            self.applied_discount_amount = sum(amount for rule, amount in rule_amounts)
     
     def _get_discount_product(self):
         """Get or create the discount product"""
@@ -0,0 +1 @@
+from . import test_discount_scoring
\ No newline at end of file
@@ -0,0 +1,72 @@
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestDiscountScoring(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Rule = cls.env['sale.discount.rule']
+        cls.parent_categ = cls.env['product.category'].create({'name': 'Discounted Parent'})
+        cls.child_categ = cls.env['product.category'].create({'name': 'Discounted Child', 'parent_id': cls.parent_categ.id})
+        cls.other_categ = cls.env['product.category'].create({'name': 'Not Discounted'})
+        cls.products = cls.env['product.product'].create([
+            {'name': 'Scored Product %s' % index, 'categ_id': categ.id}
+            for index, categ in enumerate([cls.other_categ, cls.child_categ, cls.other_categ])
+        ])
+        cls.partner = cls.env['res.partner'].create({'name': 'Discounted Customer'})
+
+    def _create_rules(self, vals_list):
+        return self.Rule.create([{
+            'name': 'Rule %s' % index,
+            'sequence': index,
+            'min_amount': 0.0,
+            **vals,
+        } for index, vals in enumerate(vals_list)])
+
+    def test_exclusive_and_stackable_compounding(self):
+        rules = self._create_rules([
+            {'discount_percent': 10.0},
+            {'discount_percent': 20.0},
+            {'discount_percent': 10.0, 'stackable': True},
+            {'discount_percent': 50.0, 'stackable': True},
+        ])
+        applicable, discounts = self.Rule._score_lines(rules, [(self.products[0].id, self.other_categ.id, 100.0)])
+        
+        self.assertTrue(applicable.all())
+        # Best exclusive rule first (20), then each stackable rule on what remains: 80 * 10%, 72 * 50%
+        self.assertEqual([round(value, 6) for value in discounts[:, 0]], [0.0, 20.0, 8.0, 36.0])
+        self.assertAlmostEqual(100.0 - discounts.sum(), 100.0 * 0.8 * 0.9 * 0.5)
+
+    def test_product_and_category_scope(self):
+        rules = self._create_rules([
+            {'discount_percent': 30.0, 'scope': 'product', 'product_ids': [(6, 0, self.products[0].ids)]},
+            {'discount_percent': 10.0, 'scope': 'category', 'categ_ids': [(6, 0, self.parent_categ.ids)]},
+        ])
+        lines_data = [(product.id, product.categ_id.id, subtotal) for product, subtotal in zip(self.products, [100.0, 200.0, 50.0])]
+        applicable, discounts = self.Rule._score_lines(rules, lines_data)
+        
+        # The category rule reaches the subcategory, the third line matches no rule
+        self.assertEqual(applicable.tolist(), [[True, False, False], [False, True, False]])
+        self.assertEqual([round(value, 6) for value in discounts.sum(axis=0)], [30.0, 20.0, 0.0])
+
+    def test_order_wide_rules_discount_net_total(self):
+        self.Rule.search([]).active = False
+        rules = self._create_rules([{'discount_percent': 10.0}, {'discount_percent': 20.0}])
+        order = self.env['sale.order'].create({
+            'partner_id': self.partner.id,
+            'order_line': [(0, 0, {
+                'product_id': product.id,
+                'product_uom_qty': 1,
+                'price_unit': price_unit,
+                'tax_id': [(5, 0, 0)],
+            }) for product, price_unit in zip(self.products[:2], [1000.0, -200.0])],
+        })
+        
+        # Only the best exclusive rule applies, on the 800 net total as before line-level scoring
+        discount_lines = order.order_line.filtered('is_discount_line')
+        self.assertEqual(discount_lines.mapped('price_unit'), [-160.0])
+        self.assertEqual(order.applied_discount_rule_id, rules[1])
+        self.assertEqual(order.applied_discount_amount, 160.0)
\ No newline at end of file
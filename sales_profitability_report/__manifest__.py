@@ -13,8 +13,11 @@ Features:
 - Revenue, cost, and margin calculations from sale order lines
 - Filter by date range, product category, and customer
 - Exportable to Excel for further analysis
+- Generated Excel files reused for identical requests and removed once their retention expires
 - Printable QWeb reports for presentations
+- Interactive server-paged analysis with on-demand order line drill-down
 - Real-time profitability calculations
+- Revenue of foreign currency orders converted into the company currency
 
 Reports Include:
 - Revenue from sale order lines (price_untaxed)
@@ -31,9 +34,14 @@ Reports Include:
     },
     'data': [
         'security/ir.model.access.csv',
+        'security/sales_profitability_security.xml',
+        'views/sales_profitability_line_views.xml',
         'wizard/sales_profitability_wizard_views.xml',
         'reports/sales_profitability_report_template.xml',
+        'views/sales_profitability_report_file_views.xml',
         'views/menu.xml',
+        'data/ir_config_parameter_data.xml',
+        'data/ir_cron_data.xml',
     ],
     'demo': [],
     'installable': True,
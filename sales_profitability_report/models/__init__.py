@@ -1 +1,3 @@
-from . import sales_profitability_report
\ No newline at end of file
+from . import sales_profitability_report
+from . import sales_profitability_line
+from . import sales_profitability_report_file
\ No newline at end of file
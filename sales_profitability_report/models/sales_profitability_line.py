@@ -0,0 +1,75 @@
+from odoo import models, fields, api, tools
+
+# Rate converting the order currency into the company currency, shared by the analysis view and
+# the PDF/xlsx report. Like sale.report, it uses the rate stored on the order at its date.
+ORDER_RATE_EXPR = """
+    1.0 / CASE COALESCE(sale.currency_rate, 0) WHEN 0 THEN 1.0 ELSE sale.currency_rate END
+"""
+
+
+class SalesProfitabilityLine(models.Model):
+    _name = 'sales.profitability.line'
+    _description = 'Sales Profitability Analysis Line'
+    _auto = False
+    _order = 'date_order desc, order_id desc, id'
+    _rec_name = 'product_id'
+
+    order_id = fields.Many2one('sale.order', string='Order', readonly=True)
+    date_order = fields.Datetime(string='Date', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Customer', readonly=True)
+    user_id = fields.Many2one('res.users', string='Salesperson', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Quotation'),
+        ('sent', 'Quotation Sent'),
+        ('sale', 'Sales Order'),
+        ('cancel', 'Cancelled'),
+    ], string='Order Status', readonly=True)
+    
+    product_id = fields.Many2one('product.product', string='Product', readonly=True)
+    categ_id = fields.Many2one('product.category', string='Product Category', readonly=True)
+    quantity = fields.Float(string='Quantity', readonly=True)
+    
+    revenue = fields.Monetary(string='Revenue', readonly=True)
+    cost = fields.Monetary(string='Cost', readonly=True)
+    margin = fields.Monetary(string='Margin', readonly=True)
+    margin_percent = fields.Float(string='Margin %', compute='_compute_margin_percent')
+
+    def _compute_margin_percent(self):
+        for line in self:
+            line.margin_percent = (line.margin / line.revenue * 100) if line.revenue else 0.0
+
+    @api.model
+    def _get_order_rates(self, orders):
+        """Conversion rates {order id: rate} of the orders into their company currency"""
+        return {order.id: 1.0 / order.currency_rate if order.currency_rate else 1.0 for order in orders}
+
+    def init(self):
+        # Revenue converted with the shared order rate, cost from the company's standard price
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW %(table)s AS (
+                SELECT line.id,
+                       line.order_id,
+                       sale.date_order,
+                       sale.partner_id,
+                       sale.user_id,
+                       sale.company_id,
+                       company.currency_id,
+                       sale.state,
+                       line.product_id,
+                       template.categ_id,
+                       line.product_uom_qty AS quantity,
+                       line.price_subtotal * %(rate)s AS revenue,
+                       line.product_uom_qty * COALESCE((product.standard_price ->> sale.company_id::text)::numeric, 0) AS cost,
+                       line.price_subtotal * %(rate)s
+                           - line.product_uom_qty * COALESCE((product.standard_price ->> sale.company_id::text)::numeric, 0) AS margin
+                  FROM sale_order_line line
+                  JOIN sale_order sale ON sale.id = line.order_id
+                  JOIN res_company company ON company.id = sale.company_id
+                  JOIN product_product product ON product.id = line.product_id
+                  JOIN product_template template ON template.id = product.product_tmpl_id
+                 WHERE line.display_type IS NULL
+            )
+        """ % {'table': self._table, 'rate': ORDER_RATE_EXPR})
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+RETENTION_PARAM = 'sales_profitability_report.file_retention_hours'
+DEFAULT_RETENTION_HOURS = 24
+
+# Garbage collection cron limits: files removed per batch and wall time per run (seconds)
+GC_BATCH_SIZE = 200
+GC_TIME_LIMIT = 120
+
+
+class SalesProfitabilityReportFile(models.Model):
+    _name = 'sales.profitability.report.file'
+    _description = 'Generated Sales Profitability Report File'
+    _order = 'expiry_date desc, id desc'
+    _rec_name = 'attachment_id'
+
+    params_hash = fields.Char(string='Parameters Hash', required=True, readonly=True, index=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Attachment', required=True, readonly=True,
+                                    ondelete='cascade')
+    file_size = fields.Integer(related='attachment_id.file_size', string='File Size')
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Requested By', readonly=True)
+    expiry_date = fields.Datetime(string='Expires On', required=True, readonly=True, index=True)
+
+    @api.model
+    def _get_retention_hours(self):
+        """Hours a generated report file is kept and reused"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(RETENTION_PARAM, DEFAULT_RETENTION_HOURS))
+
+    @api.model
+    def _get_valid_attachment(self, params_hash, company):
+        """Attachment of an unexpired file generated with the same parameters, if any"""
+        report_file = self.sudo().search([
+            ('params_hash', '=', params_hash),
+            ('company_id', '=', company.id),
+            ('user_id', '=', self.env.uid),
+            ('expiry_date', '>', fields.Datetime.now()),
+        ], limit=1)
+        return report_file.attachment_id.with_env(self.env)
+
+    @api.model
+    def _register_attachment(self, params_hash, company, attachment):
+        """Track a freshly generated report attachment until its retention expires"""
+        return self.sudo().create({
+            'params_hash': params_hash,
+            'attachment_id': attachment.id,
+            'company_id': company.id,
+            'user_id': self.env.uid,
+            'expiry_date': fields.Datetime.now() + timedelta(hours=self._get_retention_hours()),
+        })
+
+    @api.model
+    def _cron_gc_expired_files(self, batch_size=GC_BATCH_SIZE, time_limit=GC_TIME_LIMIT):
+        """Delete expired report files and their attachments, in batches and within a time budget"""
+        deadline = time.monotonic() + time_limit
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        domain = [('expiry_date', '<=', fields.Datetime.now())]
+        done = 0
+        while time.monotonic() < deadline:
+            report_files = self.sudo().search(domain, limit=batch_size, order='expiry_date, id')
+            if not report_files:
+                break
+            # Deleting the attachments removes the tracking records through the cascade
+            report_files.attachment_id.unlink()
+            done += len(report_files)
+            if auto_commit:
+                self.env.cr.commit()
+        remaining = self.sudo().search_count(domain)
+        _logger.info("Sales profitability report files: %s expired file(s) removed, %s remaining", done, remaining)
+        self.env['ir.cron']._notify_progress(done=done, remaining=remaining)
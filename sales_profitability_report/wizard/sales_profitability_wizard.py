@@ -1,7 +1,10 @@
 from odoo import models, fields, api, _
+from odoo.tools import SQL
 from odoo.exceptions import UserError
 import base64
+import hashlib
 import io
+import json
 try:
     import xlsxwriter
 except ImportError:
@@ -68,15 +71,22 @@ class SalesProfitabilityWizard(models.TransientModel):
         if not xlsxwriter:
             raise UserError(_("The xlsxwriter Python library is not installed. Please install it using: pip install xlsxwriter"))
         
-        data = self._get_report_data()
-        excel_file = self._generate_excel_report(data)
+        # Reuse the file generated earlier for the same parameters and unchanged orders
+        report_file_model = self.env['sales.profitability.report.file']
+        params_hash = self._get_report_params_hash()
+        attachment = report_file_model._get_valid_attachment(params_hash, self.company_id)
         
-        attachment = self.env['ir.attachment'].create({
-            'name': 'Sales_Profitability_Report.xlsx',
-            'type': 'binary',
-            'datas': base64.b64encode(excel_file),
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        })
+        if not attachment:
+            data = self._get_report_data()
+            excel_file = self._generate_excel_report(data)
+            
+            attachment = self.env['ir.attachment'].create({
+                'name': 'Sales_Profitability_Report.xlsx',
+                'type': 'binary',
+                'datas': base64.b64encode(excel_file),
+                'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            })
+            report_file_model._register_attachment(params_hash, self.company_id, attachment)
         
         return {
             'type': 'ir.actions.act_url',
@@ -84,9 +94,68 @@ class SalesProfitabilityWizard(models.TransientModel):
             'target': 'new',
         }
 
-    def _get_report_data(self):
-        """Get profitability data for the report"""
-        # Build domain for sale orders
+    def action_open_interactive_report(self):
+        """Open the profitability lines grouped by order, paged and sorted by the server"""
+        domain = self._get_order_domain()
+        if self.categ_ids:
+            domain.append(('categ_id', 'in', self.categ_ids.ids))
+        
+        return {
+            'name': _('Sales Profitability Analysis'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'sales.profitability.line',
+            'view_mode': 'list',
+            'views': [(self.env.ref('sales_profitability_report.view_sales_profitability_line_tree').id, 'list')],
+            'search_view_id': [self.env.ref('sales_profitability_report.view_sales_profitability_line_search').id],
+            'domain': domain,
+            'context': {'group_by': ['order_id']},
+            'target': 'current',
+        }
+
+    def _get_report_params_hash(self):
+        """Hash of the report parameters, the requesting user and the state of the report data"""
+        self.ensure_one()
+        params = {
+            'date_from': str(self.date_from),
+            'date_to': str(self.date_to),
+            'partner_ids': sorted(self.partner_ids.ids),
+            'categ_ids': sorted(self.categ_ids.ids),
+            'state': self.state or '',
+            'company_id': self.company_id.id,
+            'uid': self.env.uid,
+            'data': [str(value) for value in self._get_report_data_version()],
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def _get_report_data_version(self):
+        """Counts and latest write dates of everything the report reads, in one query
+
+        Covers the matching orders (including their stored conversion rate), their lines (written
+        directly or recomputed) and their products (cost and category), so that any change,
+        addition or removal produces a new version.
+        """
+        for model in ('sale.order', 'sale.order.line', 'product.product', 'product.template'):
+            self.env[model].flush_model()
+        orders_query = self.env['sale.order']._search(self._get_order_domain())
+        self.env.cr.execute(SQL("""
+            WITH orders AS (
+                SELECT id, write_date FROM sale_order WHERE id IN %(order_ids)s
+            ), lines AS (
+                SELECT line.id, line.write_date,
+                       GREATEST(product.write_date, template.write_date) AS product_write_date
+                  FROM sale_order_line line
+                  JOIN orders ON orders.id = line.order_id
+             LEFT JOIN product_product product ON product.id = line.product_id
+             LEFT JOIN product_template template ON template.id = product.product_tmpl_id
+            )
+            SELECT (SELECT COUNT(*) FROM orders), (SELECT MAX(write_date) FROM orders),
+                   (SELECT COUNT(*) FROM lines), (SELECT MAX(write_date) FROM lines),
+                   (SELECT MAX(product_write_date) FROM lines)
+        """, order_ids=orders_query.subselect()))
+        return self.env.cr.fetchone()
+
+    def _get_order_domain(self):
+        """Build domain for sale orders"""
         domain = [
             ('date_order', '>=', self.date_from),
             ('date_order', '<=', self.date_to),
@@ -102,9 +171,18 @@ class SalesProfitabilityWizard(models.TransientModel):
             # Exclude cancelled orders by default
             domain.append(('state', '!=', 'cancel'))
         
+        return domain
+
+    def _get_report_data(self):
+        """Get profitability data for the report"""
+        domain = self._get_order_domain()
+        
         # Get sale orders
         sale_orders = self.env['sale.order'].search(domain, order='date_order desc')
         
+        # Load the rate converting each order into the company currency at once
+        order_rates = self.env['sales.profitability.line']._get_order_rates(sale_orders)
+        
         report_data = []
         total_revenue = 0.0
         total_cost = 0.0
@@ -121,8 +199,9 @@ class SalesProfitabilityWizard(models.TransientModel):
             if not order_lines:
                 continue
             
-            # Calculate order totals
-            order_revenue = sum(line.price_subtotal for line in order_lines)
+            # Calculate order totals, revenue converted from the order currency
+            rate = order_rates[order.id]
+            order_revenue = sum(line.price_subtotal for line in order_lines) * rate
             order_cost = sum(line.product_uom_qty * line.product_id.standard_price for line in order_lines)
             order_margin = order_revenue - order_cost
             order_margin_percent = (order_margin / order_revenue * 100) if order_revenue else 0.0
@@ -139,7 +218,7 @@ class SalesProfitabilityWizard(models.TransientModel):
                 'cost': order_cost,
                 'margin': order_margin,
                 'margin_percent': order_margin_percent,
-                'lines': self._get_order_lines_data(order_lines),
+                'lines': self._get_order_lines_data(order_lines, rate),
             })
         
         total_margin = total_revenue - total_cost
@@ -155,20 +234,21 @@ class SalesProfitabilityWizard(models.TransientModel):
             'currency': self.company_id.currency_id,
         }
 
-    def _get_order_lines_data(self, order_lines):
+    def _get_order_lines_data(self, order_lines, rate=1.0):
         """Get detailed line data for each order"""
         lines_data = []
         for line in order_lines:
+            line_revenue = line.price_subtotal * rate
             line_cost = line.product_uom_qty * line.product_id.standard_price
-            line_margin = line.price_subtotal - line_cost
-            line_margin_percent = (line_margin / line.price_subtotal * 100) if line.price_subtotal else 0.0
+            line_margin = line_revenue - line_cost
+            line_margin_percent = (line_margin / line_revenue * 100) if line_revenue else 0.0
             
             lines_data.append({
                 'product': line.product_id.name,
                 'category': line.product_id.categ_id.name,
                 'quantity': line.product_uom_qty,
-                'unit_price': line.price_unit,
-                'revenue': line.price_subtotal,
+                'unit_price': line.price_unit * rate,
+                'revenue': line_revenue,
                 'cost': line_cost,
                 'margin': line_margin,
                 'margin_percent': line_margin_percent,